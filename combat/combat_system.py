@@ -8,6 +8,7 @@ import threading
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from collections import deque
 
 from utils.logger import Logger
 from config.constants import COMBAT_COMBOS, TIMING_RANGES
@@ -20,7 +21,7 @@ class CombatState(Enum):
     RETREATING = "retreating"
     COOLDOWN = "cooldown"
 
-@dataclass
+@dataclass(slots=True)
 class Target:
     """Target information"""
     entity_type: str
@@ -40,8 +41,8 @@ class TargetManager:
         self.combat_system = combat_system
         self.logger = Logger()
         self.current_target = None
-        self.target_history = []
         self.max_history = 20
+        self.target_history = deque(maxlen=self.max_history)
         self.target_lock_duration = 3.0
         self.target_lost_timeout = 2.0
         
@@ -178,8 +179,6 @@ class TargetManager:
         """Switch to a new target"""
         if self.current_target:
             self.target_history.append(self.current_target)
-            if len(self.target_history) > self.max_history:
-                self.target_history.pop(0)
         
         self.current_target = new_target
         self.logger.target(f"Targeting: {new_target.entity_type} at ({new_target.x}, {new_target.y})")
@@ -302,28 +301,56 @@ class ComboManager:
         input_controller = self.combat_system.bot_engine.input_controller
         
         try:
-            for i, step in enumerate(sequence):
+            # Resolve every step's key before pressing anything, so a bad key
+            # aborts the combo up front instead of partway through it
+            attack_key = self.combat_system.bot_engine.app.config_manager.combat.attack_key
+            step_keys = []
+            for step in sequence:
                 step_type = step['type']
+                if step_type == 'tab':
+                    key = 'TAB'
+                elif step_type == 'attack':
+                    key = attack_key
+                elif step_type == 'special':
+                    key = step.get('key', 'F1')
+                elif step_type == 'movement':
+                    key = step.get('key', 'W')
+                else:
+                    key = None
+                
+                if key is not None and not input_controller.is_valid_key(key):
+                    self.logger.error(f"Combo step {step_type} has invalid key: {key}")
+                    return False
+                step_keys.append(key)
+            
+            last = len(sequence) - 1
+            pending_taps = []
+            for i, (step, key) in enumerate(zip(sequence, step_keys)):
                 delay = step.get('delay', 0.2)
                 
                 # Add human-like variance to delays
                 actual_delay = delay * random.uniform(0.8, 1.2)
                 
-                if step_type == 'tab':
-                    input_controller.tap('TAB')
-                elif step_type == 'attack':
-                    attack_key = self.combat_system.bot_engine.app.config_manager.combat.attack_key
-                    input_controller.tap(attack_key)
-                elif step_type == 'special':
-                    special_key = step.get('key', 'F1')
-                    input_controller.tap(special_key)
-                elif step_type == 'movement':
-                    move_key = step.get('key', 'W')
-                    move_duration = step.get('duration', 0.5)
-                    input_controller.hold(move_key, move_duration)
+                is_movement = step['type'] == 'movement'
+                
+                if key is not None and not is_movement:
+                    pending_taps.append(key)
+                    # A zero-delay step chains into the next one, so a run of
+                    # them goes out together in a single SendInput call
+                    if i < last and not delay:
+                        continue
+                
+                if len(pending_taps) > 1:
+                    input_controller.tap_sequence(pending_taps)
+                elif pending_taps:
+                    input_controller.tap(pending_taps[0])
+                pending_taps = []
+                
+                if is_movement:
+                    input_controller.hold(key, step.get('duration', 0.5))
                 
                 # Wait between steps (except for last step)
-                if i < len(sequence) - 1:
+                if i < last:
                     time.sleep(actual_delay)
             
             return True
@@ -342,7 +369,7 @@ class CombatSystem:
         # Combat state
         self.state = CombatState.IDLE
         self.last_state_change = time.time()
-        self.state_history = []
+        self.state_history = deque(maxlen=20)
         
         # Subsystems
         self.target_manager = TargetManager(self)
@@ -440,10 +467,10 @@ class CombatSystem:
         if old_state != self.state:
             self.last_state_change = current_time
             self.state_history.append((old_state, self.state, current_time))
-            if len(self.state_history) > 20:
-                self.state_history.pop(0)
             
             self.logger.combat(f"State: {old_state.value} → {self.state.value}")
+            # Lets the engine poll memory at the combat rate while HP is at stake
+            self.bot_engine.in_combat = self.state in (CombatState.ENGAGING, CombatState.RETREATING)
     
     def _should_retreat(self, game_state: Any) -> bool:
         """Determine if we should retreat"""
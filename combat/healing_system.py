@@ -4,9 +4,11 @@ Improved version with better logic and error handling
 """
 
 import time
+from time import monotonic
 import logging
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -56,11 +58,19 @@ class HealingSystem:
         self.emergency_heals = 0
         
         # Health trend analysis
-        self.health_history = []
         self.max_health_history = 10
+        self.health_history = deque(maxlen=self.max_health_history)
+        
+        # Bot hooks resolved once instead of hasattr() probes on every heal
+        self._resolve_bot_hooks()
         
         logger.info("Enhanced healing system initialized")
 
+    def _resolve_bot_hooks(self) -> None:
+        """Look up optional bot methods once; call again if the bot is rewired"""
+        self._bot_log = getattr(self.bot, 'log', None)
+        self._bot_input_controller = getattr(self.bot, 'input_controller', None)
+
     def update_config(self, **kwargs) -> None:
         """Update healing configuration"""
         for key, value in kwargs.items():
@@ -70,18 +80,15 @@ class HealingSystem:
 
     def add_health_sample(self, hp_pct: float, ds_pct: float) -> None:
         """Add health sample for trend analysis"""
-        current_time = time.time()
+        current_time = monotonic()
         sample = {
             'time': current_time,
             'hp_pct': hp_pct,
             'ds_pct': ds_pct
         }
         
+        # Bounded deque; the oldest sample drops off on its own
         self.health_history.append(sample)
-        
-        # Keep only recent history
-        while len(self.health_history) > self.max_health_history:
-            self.health_history.pop(0)
 
     def get_health_trend(self, stat_type: str) -> float:
         """
@@ -93,15 +100,13 @@ class HealingSystem:
         Returns:
             Trend value in percentage points per second
         """
-        if len(self.health_history) < 2:
+        history = self.health_history
+        if len(history) < 2:
             return 0.0
         
-        recent_samples = self.health_history[-3:]  # Use last 3 samples
-        if len(recent_samples) < 2:
-            return 0.0
-        
-        first_sample = recent_samples[0]
-        last_sample = recent_samples[-1]
+        # Use last 3 samples
+        first_sample = history[-min(3, len(history))]
+        last_sample = history[-1]
         
         time_diff = last_sample['time'] - first_sample['time']
         if time_diff <= 0:
@@ -123,7 +128,7 @@ class HealingSystem:
             List of available healing items
         """
         available_items = []
-        current_time = time.time()
+        current_time = monotonic()
         
         # Get items from bot configuration
         for name, data in self.bot.heal_items.items():
@@ -260,7 +265,7 @@ class HealingSystem:
         Returns:
             Tuple of (should_heal, reason)
         """
-        current_time = time.time()
+        current_time = monotonic()
         current_pct = stats[f'{stat_type}_pct']
         
         # Check if we're already at full health
@@ -298,13 +303,14 @@ class HealingSystem:
         
         return False, "No need"
 
+    def _in_combat(self) -> bool:
+        """Whether the bot is fighting (adjust to your bot's combat detection)"""
+        return getattr(self.bot, 'target_locked', False) or \
+               getattr(self.bot, 'hunting_state', 'idle') == 'engaging'
+
     def _get_min_heal_delay(self) -> float:
         """Get minimum delay between heals based on combat state"""
-        # Check if in combat (you may need to adjust this based on your bot's combat detection)
-        in_combat = getattr(self.bot, 'target_locked', False) or \
-                   getattr(self.bot, 'hunting_state', 'idle') == 'engaging'
-        
-        if in_combat:
+        if self._in_combat():
             return self.config.combat_heal_delay * self.config.emergency_multiplier
         else:
             return self.config.normal_heal_delay
@@ -321,15 +327,16 @@ class HealingSystem:
         Returns:
             True if successful, False otherwise
         """
-        current_time = time.time()
+        current_time = monotonic()
         current_pct = stats[f'{item.item_type}_pct']
         
         self.healing_in_progress = True
         
         try:
             # Stop any current movement
-            if hasattr(self.bot, 'input_controller'):
-                self.bot.input_controller.stop_hold()
+            input_controller = self._bot_input_controller
+            if input_controller is not None:
+                input_controller.stop_hold()
             
             # Small delay for safety
             time.sleep(0.1)
@@ -359,8 +366,8 @@ class HealingSystem:
                 
                 # Log the heal
                 log_msg = f"✚ {item.name} ({item.key}) | {current_pct:.1f}% | {reason}"
-                if hasattr(self.bot, 'log'):
-                    self.bot.log(log_msg, "🏥")
+                if self._bot_log:
+                    self._bot_log(log_msg, "🏥")
                 else:
                     logger.info(log_msg)
                 
@@ -372,8 +379,8 @@ class HealingSystem:
             self.failed_heals[item.item_type] += 1
             error_msg = f"Heal failed: {e}"
             
-            if hasattr(self.bot, 'log'):
-                self.bot.log(error_msg, "❌")
+            if self._bot_log:
+                self._bot_log(error_msg, "❌")
             else:
                 logger.error(error_msg)
             
@@ -387,10 +394,10 @@ class HealingSystem:
         Main healing check function - call this regularly
         
         Args:
-            current_time: Current time (will use time.time() if None)
+            current_time: Current monotonic time (will use time.monotonic() if None)
         """
         if current_time is None:
-            current_time = time.time()
+            current_time = monotonic()
         
         # Skip if healing disabled or already in progress
         if not getattr(self.bot.config, 'smart_healing', {}).get() or self.healing_in_progress:
@@ -400,7 +407,8 @@ class HealingSystem:
         try:
             if hasattr(self.bot, 'memory') and hasattr(self.bot.config, 'use_memory'):
                 if self.bot.config['use_memory'].get():
-                    stats = self.bot.memory.get_stats()
+                    # In combat the reader must not serve idle-cached stats
+                    stats = self.bot.memory.get_stats(in_combat=self._in_combat())
                 else:
                     stats = self._get_default_stats()
             else:
@@ -446,8 +454,8 @@ class HealingSystem:
                 # Log if too many failures
                 if self.failed_heals[stat_type] >= self.config.max_heal_attempts:
                     error_msg = f"Max {stat_type.upper()} heal attempts reached ({self.config.max_heal_attempts})"
-                    if hasattr(self.bot, 'log'):
-                        self.bot.log(error_msg, "❌")
+                    if self._bot_log:
+                        self._bot_log(error_msg, "❌")
                     else:
                         logger.warning(error_msg)
         
@@ -473,7 +481,7 @@ class HealingSystem:
         Returns:
             Dictionary with detailed healing status
         """
-        current_time = time.time()
+        current_time = monotonic()
         
         status = {
             'enabled': getattr(self.bot.config, 'smart_healing', {}).get(),
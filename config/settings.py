@@ -4,12 +4,22 @@ Centralized configuration management with validation and persistence
 
 import json
 import os
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, asdict, field
+from typing import Dict, Any, Optional, List, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 import threading
 
-@dataclass
+def _make_to_dict(cls):
+    """Attach a generated to_dict that returns a flat dict literal of the fields"""
+    fields = tuple(cls.__dataclass_fields__)
+    body = ', '.join(f'{name!r}: self.{name}' for name in fields)
+    namespace = {}
+    exec(f"def to_dict(self):\n    return {{{body}}}", namespace)
+    cls.to_dict = namespace['to_dict']
+    return cls
+
+@_make_to_dict
+@dataclass(slots=True)
 class CombatConfig:
     """Combat system configuration"""
     attack_key: str = "1"
@@ -27,7 +37,8 @@ class CombatConfig:
     auto_target: bool = True
     target_switching: bool = True
     
-@dataclass
+@_make_to_dict
+@dataclass(slots=True)
 class HealingConfig:
     """Healing system configuration"""
     smart_healing: bool = True
@@ -41,7 +52,8 @@ class HealingConfig:
     health_monitoring: bool = True
     auto_potion_buy: bool = False
     
-@dataclass
+@_make_to_dict
+@dataclass(slots=True)
 class HealingItem:
     """Individual healing item configuration"""
     key: str = "1"
@@ -50,8 +62,25 @@ class HealingItem:
     item_type: str = "hp"  # hp or ds
     priority: int = 1
     cooldown: float = 2.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HealingItem':
+        """Build from a saved dict, skipping **kwargs reflection on the common path"""
+        try:
+            obj = cls.__new__(cls)
+            obj.key = data['key']
+            obj.enabled = data['enabled']
+            obj.threshold = data['threshold']
+            obj.item_type = data['item_type']
+            obj.priority = data['priority']
+            obj.cooldown = data.get('cooldown', 2.0)
+            return obj
+        except KeyError:
+            # Partial dicts (older saves) fall back to the field defaults
+            return cls(**data)
     
-@dataclass
+@_make_to_dict
+@dataclass(slots=True)
 class SkillConfig:
     """Skill/Special attack configuration"""
     enabled: bool = True
@@ -61,7 +90,24 @@ class SkillConfig:
     emergency_use: bool = False
     combo_starter: bool = False
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SkillConfig':
+        """Build from a saved dict, skipping **kwargs reflection on the common path"""
+        try:
+            obj = cls.__new__(cls)
+            obj.enabled = data['enabled']
+            obj.cooldown = data['cooldown']
+            obj.usage_chance = data['usage_chance']
+            obj.combat_only = data['combat_only']
+            obj.emergency_use = data['emergency_use']
+            obj.combo_starter = data['combo_starter']
+            return obj
+        except KeyError:
+            # Partial dicts (older saves) fall back to the field defaults
+            return cls(**data)
+
+@_make_to_dict
+@dataclass(slots=True)
 class MovementConfig:
     """Movement and pathfinding configuration"""
     auto_move: bool = True
@@ -75,7 +121,8 @@ class MovementConfig:
     stuck_detection: bool = True
     pathfinding_enabled: bool = True
     
-@dataclass
+@_make_to_dict
+@dataclass(slots=True)
 class AntiDetectionConfig:
     """Anti-detection system configuration"""
     human_timing: bool = True
@@ -90,7 +137,8 @@ class AntiDetectionConfig:
     fatigue_simulation: bool = True
     attention_simulation: bool = True
     
-@dataclass
+@_make_to_dict
+@dataclass(slots=True)
 class MemoryConfig:
     """Memory reading configuration"""
     use_memory: bool = True
@@ -102,7 +150,8 @@ class MemoryConfig:
     connection_timeout: int = 5
     retry_attempts: int = 3
     
-@dataclass
+@_make_to_dict
+@dataclass(slots=True)
 class DetectionConfig:
     """Computer vision detection configuration"""
     enabled: bool = True
@@ -113,7 +162,8 @@ class DetectionConfig:
     multi_threading: bool = True
     color_profiles: Dict[str, Any] = field(default_factory=dict)
     
-@dataclass
+@_make_to_dict
+@dataclass(slots=True)
 class GUIConfig:
     """GUI configuration"""
     theme: str = "Dark"
@@ -124,7 +174,8 @@ class GUIConfig:
     log_max_lines: int = 1000
     real_time_updates: bool = True
     
-@dataclass
+@_make_to_dict
+@dataclass(slots=True)
 class SecurityConfig:
     """Security and privacy configuration"""
     encrypt_settings: bool = False
@@ -155,39 +206,31 @@ class ConfigValidator:
         return value > 0
     
     @staticmethod
-    def validate_combat_config(config: CombatConfig) -> List[str]:
-        """Validate combat configuration"""
-        errors = []
-        
+    def validate_combat_config(config: CombatConfig) -> Iterator[str]:
+        """Validate combat configuration, yielding each error"""
         if not ConfigValidator.validate_key(config.attack_key):
-            errors.append(f"Invalid attack key: {config.attack_key}")
+            yield f"Invalid attack key: {config.attack_key}"
             
         if not ConfigValidator.validate_key(config.pickup_key):
-            errors.append(f"Invalid pickup key: {config.pickup_key}")
+            yield f"Invalid pickup key: {config.pickup_key}"
             
         if not ConfigValidator.validate_positive_number(config.attack_cooldown):
-            errors.append("Attack cooldown must be positive")
+            yield "Attack cooldown must be positive"
             
         if not ConfigValidator.validate_percentage(config.retreat_hp_threshold):
-            errors.append("Retreat HP threshold must be 0-100")
-            
-        return errors
+            yield "Retreat HP threshold must be 0-100"
     
     @staticmethod
-    def validate_healing_config(config: HealingConfig) -> List[str]:
-        """Validate healing configuration"""
-        errors = []
-        
+    def validate_healing_config(config: HealingConfig) -> Iterator[str]:
+        """Validate healing configuration, yielding each error"""
         if not ConfigValidator.validate_positive_number(config.combat_heal_delay):
-            errors.append("Combat heal delay must be positive")
+            yield "Combat heal delay must be positive"
             
         if not ConfigValidator.validate_positive_number(config.normal_heal_delay):
-            errors.append("Normal heal delay must be positive")
+            yield "Normal heal delay must be positive"
             
         if not ConfigValidator.validate_percentage(config.panic_threshold):
-            errors.append("Panic threshold must be 0-100")
-            
-        return errors
+            yield "Panic threshold must be 0-100"
 
 class ConfigManager:
     """Main configuration manager"""
@@ -236,16 +279,24 @@ class ConfigManager:
                 config_path = self.config_dir / f"{config_name}.json"
                 
                 # Convert dataclass to dict if needed
-                if hasattr(config_obj, '__dataclass_fields__'):
-                    data = asdict(config_obj)
+                if hasattr(config_obj, 'to_dict'):
+                    data = config_obj.to_dict()
                 elif isinstance(config_obj, dict):
-                    data = config_obj
+                    data = {
+                        name: value.to_dict() if hasattr(value, 'to_dict') else value
+                        for name, value in config_obj.items()
+                    }
                 else:
                     data = config_obj.__dict__
                 
-                with open(config_path, 'w') as f:
-                    json.dump(data, f, indent=2)
-                    
+                # Serialize up front, write in one buffered call, then swap the
+                # file in atomically so a crash never leaves a torn config
+                payload = json.dumps(data, indent=2).encode('utf-8')
+                tmp_path = config_path.with_suffix('.json.tmp')
+                with open(tmp_path, 'wb', buffering=65536) as f:
+                    f.write(payload)
+                os.replace(tmp_path, config_path)
+
                 return True
                 
             except Exception as e:
@@ -312,13 +363,13 @@ class ConfigManager:
             if healing_items_data:
                 for name, item_data in healing_items_data.items():
                     if isinstance(item_data, dict):
-                        self.healing_items[name] = HealingItem(**item_data)
+                        self.healing_items[name] = HealingItem.from_dict(item_data)
                         
             skills_data = self.load_config('skills', dict)
             if skills_data:
                 for skill, skill_data in skills_data.items():
                     if isinstance(skill_data, dict):
-                        self.skills[skill] = SkillConfig(**skill_data)
+                        self.skills[skill] = SkillConfig.from_dict(skill_data)
                         
         except Exception as e:
             print(f"Error loading configs: {e}")
@@ -327,11 +378,11 @@ class ConfigManager:
         """Validate all configurations and return errors"""
         all_errors = {}
         
-        combat_errors = ConfigValidator.validate_combat_config(self.combat)
+        combat_errors = list(ConfigValidator.validate_combat_config(self.combat))
         if combat_errors:
             all_errors['combat'] = combat_errors
             
-        healing_errors = ConfigValidator.validate_healing_config(self.healing)
+        healing_errors = list(ConfigValidator.validate_healing_config(self.healing))
         if healing_errors:
             all_errors['healing'] = healing_errors
             
@@ -364,16 +415,16 @@ class ConfigManager:
         """Export all configurations to a file"""
         try:
             all_configs = {
-                'combat': asdict(self.combat),
-                'healing': asdict(self.healing),
-                'movement': asdict(self.movement),
-                'anti_detection': asdict(self.anti_detection),
-                'memory': asdict(self.memory),
-                'detection': asdict(self.detection),
-                'gui': asdict(self.gui),
-                'security': asdict(self.security),
-                'healing_items': {k: asdict(v) for k, v in self.healing_items.items()},
-                'skills': {k: asdict(v) for k, v in self.skills.items()}
+                'combat': self.combat.to_dict(),
+                'healing': self.healing.to_dict(),
+                'movement': self.movement.to_dict(),
+                'anti_detection': self.anti_detection.to_dict(),
+                'memory': self.memory.to_dict(),
+                'detection': self.detection.to_dict(),
+                'gui': self.gui.to_dict(),
+                'security': self.security.to_dict(),
+                'healing_items': {k: v.to_dict() for k, v in self.healing_items.items()},
+                'skills': {k: v.to_dict() for k, v in self.skills.items()}
             }
             
             with open(filepath, 'w') as f:
@@ -412,12 +463,12 @@ class ConfigManager:
             # Import healing items
             if 'healing_items' in all_configs:
                 for name, item_data in all_configs['healing_items'].items():
-                    self.healing_items[name] = HealingItem(**item_data)
+                    self.healing_items[name] = HealingItem.from_dict(item_data)
                     
             # Import skills
             if 'skills' in all_configs:
                 for skill, skill_data in all_configs['skills'].items():
-                    self.skills[skill] = SkillConfig(**skill_data)
+                    self.skills[skill] = SkillConfig.from_dict(skill_data)
                     
             return True
             
@@ -2,40 +2,37 @@
 Core bot engine that orchestrates all subsystems
 """
 
-import time
+from time import monotonic
 import threading
 from typing import Dict, List, Optional, Any
-from concurrent.futures import ThreadPoolExecutor, Future
-from dataclasses import dataclass
-import queue
+from dataclasses import dataclass, field
 
 from core.memory_reader import MemoryReader
 from core.detection import DigimonDetector
 from core.input_controller import InputController
 from utils.logger import Logger
 
-@dataclass
+@dataclass(slots=True)
 class GameState:
     """Current game state information"""
     timestamp: float
     in_game: bool = False
-    player_stats: Dict[str, Any] = None
-    digimon_stats: Dict[str, Any] = None
-    detected_entities: List[Any] = None
+    player_stats: Dict[str, Any] = field(default_factory=dict)
+    digimon_stats: Dict[str, Any] = field(default_factory=dict)
+    detected_entities: List[Any] = field(default_factory=list)
     window_active: bool = False
     in_combat: bool = False
     loading: bool = False
-    position: Dict[str, float] = None
-
-    def __post_init__(self):
-        if self.player_stats is None:
-            self.player_stats = {}
-        if self.digimon_stats is None:
-            self.digimon_stats = {}
-        if self.detected_entities is None:
-            self.detected_entities = []
-        if self.position is None:
-            self.position = {'x': 0, 'y': 0, 'z': 0}
+    position: Dict[str, float] = field(default_factory=lambda: {'x': 0, 'y': 0, 'z': 0})
+
+class _NullMemory:
+    """Stand-in memory source for the loop when memory reading is off"""
+    __slots__ = ()
+
+    def get_stats(self, in_combat: bool = False) -> Dict[str, Any]:
+        return {}
+
+_NULL_MEMORY = _NullMemory()
 
 class BotEngine:
     def __init__(self, app):
@@ -52,43 +49,136 @@ class BotEngine:
         self.detector = DigimonDetector()
         self.input_ctrl = InputController()
         self.logger = Logger("BotEngine")
-        self.state_queue = queue.Queue(maxsize=10)
         self._main_thread = None
-        self._running = False
-        self._lock = threading.Lock()
+        self.target_loop_time = 0.05  # 20 Hz
+        # Snapshot of config.memory.use_memory; see set_use_memory()
+        self._use_memory = bool(self.app.config_manager.memory.use_memory)
+        self._refresh_memory_source()
+        # Set by stop() so waits in the loop return immediately on shutdown
+        self._stop_event = threading.Event()
+        # Set while running, cleared by pause(); a paused loop blocks on it
+        self._pause_event = threading.Event()
+        self._pause_event.set()
+        # A fresh state is built each tick and never touched once published,
+        # so publishing is a single reference store and readers need no lock
+        self.current_game_state: Optional[GameState] = None
+        self._last_detect_time = 0.0
+        self._last_entities = []
+        # Maintained by CombatSystem; keeps memory polling fast while fighting
+        self.in_combat = False
 
     def start(self):
         if self._main_thread and self._main_thread.is_alive():
             return
-        self._running = True
-        self._main_thread = threading.Thread(target=self._main_loop, daemon=True)
+        self._use_memory = bool(self.app.config_manager.memory.use_memory)
+        self._refresh_memory_source()
+        self._stop_event.clear()
+        self._pause_event.set()
+        self._main_thread = threading.Thread(target=self._main_loop, name="bot-main", daemon=True)
         self._main_thread.start()
 
     def stop(self):
-        self._running = False
+        self._stop_event.set()
+        self._pause_event.set()  # release a paused loop so it can exit
         if self._main_thread:
             self._main_thread.join(timeout=2)
 
+    def pause(self):
+        self._pause_event.clear()
+        self.logger.info("Bot paused")
+
+    def resume(self):
+        self._pause_event.set()
+        self.logger.info("Bot resumed")
+
+    @property
+    def paused(self) -> bool:
+        return not self._pause_event.is_set()
+
     def _main_loop(self):
-        while self._running:
+        # Bind hot attributes/globals once; the loop runs at ~20 Hz
+        wait = self._stop_event.wait
+        stopped = self._stop_event.is_set
+        running_event = self._pause_event
+        config_manager = self.app.config_manager
+        update_state = self._update_game_state
+        exec_cycle = self._execute_bot_cycle
+        logger_error = self.logger.error
+        next_tick = monotonic() + self.target_loop_time
+
+        while not stopped():
+            # Read once per tick so adjust_performance() applies on the next one
+            period = self.target_loop_time
+            if not running_event.is_set():
+                # Paused: sleep in the event wait rather than ticking idle
+                running_event.wait()
+                next_tick = monotonic() + period
+                continue
+
             try:
-                config = self.app.config_manager
-                game_state = self._update_game_state(config, GameState(timestamp=time.time()))
-                self._execute_bot_cycle(config, game_state)
-                time.sleep(0.05)
+                game_state = update_state(config_manager, GameState(timestamp=monotonic()))
+                self.current_game_state = game_state
+                exec_cycle(config_manager, game_state)
             except Exception as ex:
-                self.logger.error(f"Main loop error: {ex}")
-                time.sleep(1)
+                logger_error(f"Main loop error: {ex}")
+                wait(1)
+
+            # Sleep to the next deadline rather than a fixed delay so overruns
+            # and late wake-ups don't accumulate as drift
+            now = monotonic()
+            if next_tick > now:
+                wait(next_tick - now)
+            elif now - next_tick > period * 3:
+                # Long stall: resync instead of bursting to catch up
+                next_tick = now
+            next_tick += period
+
+    def adjust_performance(self, target_fps: int):
+        """Change the main loop rate; takes effect from the next tick"""
+        if not 1 <= target_fps <= 240:
+            if self.logger.is_enabled_for("WARNING"):
+                self.logger.warning(f"Ignoring target FPS outside 1-240: {target_fps}")
+            return
+        target_loop_time = 1.0 / target_fps
+        if target_loop_time != self.target_loop_time:
+            self.target_loop_time = target_loop_time
+            if self.logger.is_enabled_for("INFO"):
+                self.logger.info(f"Performance target adjusted to {target_fps} FPS")
+
+    def set_use_memory(self, flag: bool):
+        """Toggle memory reading at runtime without touching the hot loop's config lookups"""
+        self._use_memory = bool(flag)
+        self._refresh_memory_source()
+
+    def _refresh_memory_source(self):
+        # The loop reads from this unconditionally; self.memory itself stays
+        # in place for the GUI's connect/test actions
+        self._memory_source = self.memory if self.memory and self._use_memory else _NULL_MEMORY
+
+    def get_current_game_state(self) -> Optional[GameState]:
+        """Latest fully-updated game state (lock-free read)"""
+        return self.current_game_state
 
     def _update_game_state(self, config, game_state):
         # PATCH: Use get_stats instead of get_current_state
-        memory_data = self.memory.get_stats() if self.memory and config.memory.use_memory else {}
+        in_combat = self.in_combat
+        memory_data = self._memory_source.get_stats(in_combat=in_combat)
         # END PATCH
 
         game_state.player_stats = memory_data.get("player_stats", {})
         game_state.digimon_stats = memory_data.get("digimon_stats", {})
         game_state.in_game = memory_data.get("connected", False)
-        game_state.detected_entities = self.detector.detect()
+        game_state.in_combat = in_combat
+        # The detector's worker runs CV alongside this loop; picking up its
+        # latest result is a reference read, done once per detection interval
+        detection = config.detection
+        now = game_state.timestamp
+        if detection.enabled:
+            if now - self._last_detect_time >= detection.detection_interval:
+                self._last_entities = self.detector.detect_entities(
+                    poll_interval=detection.detection_interval)
+                self._last_detect_time = now
+            game_state.detected_entities = self._last_entities
         game_state.window_active = True  # You should replace with actual window active detection
         # Add more game state updates here if needed
         return game_state
@@ -101,13 +191,16 @@ class BotEngine:
 
         # Example: Only engage if in game or if memory is not being used
         # Add actual farming/logic code here
-        if game_state.in_game or not config.memory.use_memory:
+        if game_state.in_game or not self._use_memory:
             # Simulate actions: move, attack, heal, etc.
             detected = game_state.detected_entities
+            # Runs at loop rate; don't format the message if INFO is filtered out
+            log_info = self.logger.is_enabled_for("INFO")
             if detected:
-                self.logger.info(f"Detected {len(detected)} entities, first: {detected[0]}")
+                if log_info:
+                    self.logger.info(f"Detected {len(detected)} entities, first: {detected[0]}")
                 # Call your attack/move/heal functions here
-            else:
+            elif log_info:
                 self.logger.info("No entities detected.")
 
     # You may have more methods in the original file. Add them below.
\ No newline at end of file
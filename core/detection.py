@@ -2,15 +2,18 @@
 Advanced computer vision detection system for GDMO
 """
 
-import time
+from time import monotonic
+import ctypes
+import math
 import threading
+from collections import deque
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, Future
 import win32gui
+import win32ui
+import win32con
 import win32process
 import psutil
-from PIL import ImageGrab
 import numpy as np
 
 # Optional imports with fallbacks
@@ -21,9 +24,216 @@ try:
 except ImportError:
     print("Warning: OpenCV not available. Computer vision disabled.")
 
+NUMBA_AVAILABLE = False
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback: run the kernels below as plain Python"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+    prange = range
+
 from config.constants import DIGIMON_COLOR_PROFILES, WINDOW_DETECTION_PATTERNS, DETECTION_THRESHOLDS
 from utils.logger import Logger
 
+THREAD_PRIORITY_ABOVE_NORMAL = 1
+
+def _performance_core_mask() -> int:
+    """Affinity mask of the highest-efficiency-class logical processors.
+    
+    Returns 0 when every core is the same class (non-hybrid CPUs), since
+    pinning would then only take choices away from the scheduler.
+    """
+    kernel32 = ctypes.windll.kernel32
+    length = ctypes.c_ulong(0)
+    kernel32.GetSystemCpuSetInformation(None, 0, ctypes.byref(length), None, 0)
+    if not length.value:
+        return 0
+    buffer = ctypes.create_string_buffer(length.value)
+    if not kernel32.GetSystemCpuSetInformation(buffer, length, ctypes.byref(length), None, 0):
+        return 0
+    
+    # SYSTEM_CPU_SET_INFORMATION: Size at 0, Group at 12,
+    # LogicalProcessorIndex at 14, EfficiencyClass at 18
+    raw = buffer.raw
+    cores = []
+    offset = 0
+    while offset < length.value:
+        size = int.from_bytes(raw[offset:offset + 4], "little")
+        if size <= 0:
+            break
+        group = int.from_bytes(raw[offset + 12:offset + 14], "little")
+        if group == 0:  # an affinity mask only covers the first group
+            cores.append((raw[offset + 14], raw[offset + 18]))
+        offset += size
+    
+    classes = {efficiency for _, efficiency in cores}
+    if len(classes) < 2:
+        return 0
+    best = max(classes)
+    mask = 0
+    for index, efficiency in cores:
+        if efficiency == best:
+            mask |= 1 << index
+    return mask
+
+def _boost_current_thread(logger: Logger):
+    """Raise the calling thread's priority and keep it on performance cores"""
+    try:
+        kernel32 = ctypes.windll.kernel32
+        thread = kernel32.GetCurrentThread()
+        kernel32.SetThreadPriority(thread, THREAD_PRIORITY_ABOVE_NORMAL)
+        mask = _performance_core_mask()
+        if mask:
+            kernel32.SetThreadAffinityMask(thread, ctypes.c_size_t(mask))
+            logger.debug(f"Detector thread pinned to cores {mask:#x}")
+    except (AttributeError, OSError) as e:
+        logger.debug(f"Could not tune detector thread: {e}")
+
+# Integer ids for entity types so the kernels below can compare them natively
+ENTITY_TYPE_IDS = {name: index for index, name in enumerate(DIGIMON_COLOR_PROFILES)}
+
+def _color_bounds(config: Dict) -> Tuple[Tuple[np.ndarray, np.ndarray], ...]:
+    """A profile's HSV ranges as ready-to-use uint8 arrays"""
+    return tuple(
+        (np.asarray(lower, dtype=np.uint8), np.asarray(upper, dtype=np.uint8))
+        for lower, upper in config['colors']
+    )
+
+# Built once so inRange doesn't re-wrap the bound lists every frame
+COLOR_BOUNDS = {name: _color_bounds(config) for name, config in DIGIMON_COLOR_PROFILES.items()}
+
+def _stack_bounds(bounds: Tuple[Tuple[np.ndarray, np.ndarray], ...]) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """(N, 3) lower/upper arrays plus the V span covered by any range"""
+    lowers = np.ascontiguousarray([lower for lower, _ in bounds], dtype=np.uint8).reshape(-1, 3)
+    uppers = np.ascontiguousarray([upper for _, upper in bounds], dtype=np.uint8).reshape(-1, 3)
+    return lowers, uppers, int(lowers[:, 2].min()), int(uppers[:, 2].max())
+
+STACKED_COLOR_BOUNDS = {name: _stack_bounds(bounds) for name, bounds in COLOR_BOUNDS.items()}
+
+# 1-D kernel of the 3x3 pre-mask blur, applied separably to rows and columns
+GAUSSIAN_KERNEL = cv2.getGaussianKernel(3, 0) if CV_AVAILABLE else None
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _hsv_multi_inrange(hsv, lowers, uppers, v_min, v_max, out):
+    """OR of inRange over several HSV ranges in a single pass.
+    
+    Rejects on V first (against the union of all ranges), then tests each
+    range's V, S and H; most background pixels never get past the V check.
+    """
+    rows, cols = out.shape
+    count = lowers.shape[0]
+    for row in prange(rows):
+        for col in range(cols):
+            value = 0
+            v = hsv[row, col, 2]
+            if v_min <= v <= v_max:
+                sat = hsv[row, col, 1]
+                hue = hsv[row, col, 0]
+                for k in range(count):
+                    if (lowers[k, 2] <= v <= uppers[k, 2] and
+                            lowers[k, 1] <= sat <= uppers[k, 1] and
+                            lowers[k, 0] <= hue <= uppers[k, 0]):
+                        value = 255
+                        break
+            out[row, col] = value
+    return out
+
+@njit(cache=True, fastmath=True)
+def _suppress_overlaps(xs, ys, sizes, order):
+    """Greedy overlap suppression in `order`; returns a keep mask.
+    
+    Two entities overlap when their centers are closer than half the larger
+    of their sizes (max of width/height). Compares squared distances.
+    """
+    n = order.shape[0]
+    keep = np.zeros(n, dtype=np.bool_)
+    kept = np.empty(n, dtype=np.int64)
+    kept_count = 0
+    for oi in range(n):
+        i = order[oi]
+        overlapping = False
+        for ki in range(kept_count):
+            j = kept[ki]
+            dx = xs[i] - xs[j]
+            dy = ys[i] - ys[j]
+            radius = max(sizes[i], sizes[j]) * 0.5
+            if dx * dx + dy * dy < radius * radius:
+                overlapping = True
+                break
+        if not overlapping:
+            keep[i] = True
+            kept[kept_count] = i
+            kept_count += 1
+    return keep
+
+def _suppress_overlaps_vectorized(xs, ys, sizes, order):
+    """_suppress_overlaps for when numba is missing: each candidate is tested
+    against all kept entities at once with NumPy instead of an inner loop"""
+    n = order.shape[0]
+    keep = np.zeros(n, dtype=np.bool_)
+    kept = np.empty(n, dtype=np.int64)
+    kept_count = 0
+    for i in order.tolist():
+        if kept_count:
+            others = kept[:kept_count]
+            dx = xs[others] - xs[i]
+            dy = ys[others] - ys[i]
+            radius = np.maximum(sizes[others], sizes[i]) * 0.5
+            if (dx * dx + dy * dy < radius * radius).any():
+                continue
+        keep[i] = True
+        kept[kept_count] = i
+        kept_count += 1
+    return keep
+
+# Interpreted, the scalar kernel is slower than the vectorized version
+suppress_overlaps = _suppress_overlaps if NUMBA_AVAILABLE else _suppress_overlaps_vectorized
+
+@njit(cache=True, fastmath=True)
+def _history_stability(xs, ys, types, timestamps, hist_xs, hist_ys, hist_types, hist_timestamps):
+    """Best stability score per entity against same-type history within 100px"""
+    n = xs.shape[0]
+    m = hist_xs.shape[0]
+    scores = np.zeros(n, dtype=np.float64)
+    for i in range(n):
+        best = 0.0
+        for j in range(m):
+            if hist_types[j] == types[i]:
+                dx = xs[i] - hist_xs[j]
+                dy = ys[i] - hist_ys[j]
+                if dx * dx + dy * dy < 10000.0:
+                    score = 1.0 - (timestamps[i] - hist_timestamps[j]) / 2.0
+                    if score > best:
+                        best = score
+        scores[i] = best
+    return scores
+
+def _history_stability_vectorized(xs, ys, types, timestamps, hist_xs, hist_ys, hist_types, hist_timestamps):
+    """_history_stability for when numba is missing: every entity/history
+    pair is scored at once with NumPy broadcasting instead of a double loop"""
+    if not hist_xs.shape[0]:
+        return np.zeros(xs.shape[0], dtype=np.float64)
+    dx = xs[:, None] - hist_xs[None, :]
+    dy = ys[:, None] - hist_ys[None, :]
+    near = (types[:, None] == hist_types[None, :]) & (dx * dx + dy * dy < 10000.0)
+    score = 1.0 - (timestamps[:, None] - hist_timestamps[None, :]) / 2.0
+    return np.where(near, score, 0.0).max(axis=1, initial=0.0)
+
+history_stability = _history_stability if NUMBA_AVAILABLE else _history_stability_vectorized
+
+def _entity_arrays(entities: List['DetectedEntity']) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Positions, type ids and timestamps of entities as contiguous arrays"""
+    count = len(entities)
+    xs = np.fromiter((e.x for e in entities), dtype=np.float64, count=count)
+    ys = np.fromiter((e.y for e in entities), dtype=np.float64, count=count)
+    types = np.fromiter((e.type_id for e in entities), dtype=np.int32, count=count)
+    timestamps = np.fromiter((e.timestamp for e in entities), dtype=np.float64, count=count)
+    return xs, ys, types, timestamps
+
 @dataclass
 class DetectedEntity:
     """Represents a detected entity in the game"""
@@ -33,11 +243,17 @@ class DetectedEntity:
     width: int
     height: int
     confidence: float
-    distance_from_center: float
+    distance_sq_from_center: float  # squared; see distance_from_center
     area: int
     timestamp: float
     color_match_score: float
     stability_score: float = 1.0
+    type_id: int = -1  # ENTITY_TYPE_IDS entry, compared instead of entity_type
+    
+    @property
+    def distance_from_center(self) -> float:
+        """Euclidean distance, only taking the square root when asked for"""
+        return self.distance_sq_from_center ** 0.5
 
 @dataclass
 class DetectionRegion:
@@ -49,6 +265,131 @@ class DetectionRegion:
     priority: int
     last_detection: float = 0
 
+class DetectionHistory:
+    """Recent detections stored column-wise in fixed-size arrays.
+    
+    Entries are appended in time order into a buffer twice the capacity; the
+    live window [start, end) slides forward and is compacted to the front
+    when the buffer fills, so it is always one contiguous, time-sorted slice
+    that can be searched with searchsorted and handed to the kernels as-is.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        size = capacity * 2
+        self.xs = np.empty(size, dtype=np.float64)
+        self.ys = np.empty(size, dtype=np.float64)
+        self.types = np.empty(size, dtype=np.int32)
+        self.timestamps = np.empty(size, dtype=np.float64)
+        self.entities: List[Optional[DetectedEntity]] = [None] * size
+        self._start = 0
+        self._end = 0
+    
+    def __len__(self) -> int:
+        return self._end - self._start
+    
+    def _compact(self):
+        """Move the live window to the front of the buffer"""
+        start, end = self._start, self._end
+        live = end - start
+        for column in (self.xs, self.ys, self.types, self.timestamps):
+            column[:live] = column[start:end]
+        entities = self.entities
+        entities[:live] = entities[start:end]
+        entities[live:end] = [None] * (end - live)
+        self._start, self._end = 0, live
+    
+    def extend(self, entities: List[DetectedEntity]):
+        """Append entities from one detection pass, dropping the oldest beyond capacity"""
+        if not entities:
+            return
+        if len(entities) > self.capacity:
+            entities = entities[-self.capacity:]
+        count = len(entities)
+        if self._end + count > len(self.entities):
+            self._compact()
+        
+        begin, end = self._end, self._end + count
+        xs, ys, types, timestamps = _entity_arrays(entities)
+        self.xs[begin:end] = xs
+        self.ys[begin:end] = ys
+        self.types[begin:end] = types
+        self.timestamps[begin:end] = timestamps
+        self.entities[begin:end] = entities
+        self._end = end
+        self._start = max(self._start, end - self.capacity)
+    
+    def first_after(self, since: float) -> int:
+        """Buffer index of the first entry newer than `since`"""
+        start = self._start
+        return start + int(np.searchsorted(self.timestamps[start:self._end], since, side='right'))
+    
+    def expire(self, cutoff: float):
+        """Drop entries at or before cutoff"""
+        self._start = self.first_after(cutoff)
+    
+    def columns(self, first: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Views of x, y, type id and timestamp from `first` to the newest entry"""
+        end = self._end
+        return self.xs[first:end], self.ys[first:end], self.types[first:end], self.timestamps[first:end]
+    
+    def clear(self):
+        self.entities[self._start:self._end] = [None] * len(self)
+        self._start = self._end = 0
+
+class ScreenCapture:
+    """Persistent GDI capture: the screen DC, memory DC and bitmap are reused across frames"""
+    
+    def __init__(self):
+        self._screen_hdc = None
+        self._src_dc = None
+        self._mem_dc = None
+        self._bitmap = None
+        self._size = (0, 0)
+    
+    def _ensure_target(self, width: int, height: int):
+        """Create the DCs once and the bitmap only when the capture size changes"""
+        if self._mem_dc is None:
+            self._screen_hdc = win32gui.GetWindowDC(0)
+            self._src_dc = win32ui.CreateDCFromHandle(self._screen_hdc)
+            self._mem_dc = self._src_dc.CreateCompatibleDC()
+        
+        if self._size != (width, height):
+            bitmap = win32ui.CreateBitmap()
+            bitmap.CreateCompatibleBitmap(self._src_dc, width, height)
+            # Selecting the new bitmap swaps the old one out of the DC, and
+            # only an unselected bitmap can be freed
+            self._mem_dc.SelectObject(bitmap)
+            if self._bitmap is not None:
+                win32gui.DeleteObject(self._bitmap.GetHandle())
+            self._bitmap = bitmap
+            self._size = (width, height)
+    
+    def grab(self, bbox: Tuple[int, int, int, int]) -> np.ndarray:
+        """Capture a screen rectangle as a BGRA array"""
+        left, top, right, bottom = bbox
+        width, height = right - left, bottom - top
+        self._ensure_target(width, height)
+        self._mem_dc.BitBlt((0, 0), (width, height), self._src_dc, (left, top), win32con.SRCCOPY)
+        
+        # GDI already stores pixels as BGRA, so no channel swap is needed
+        bits = self._bitmap.GetBitmapBits(True)
+        return np.frombuffer(bits, dtype=np.uint8).reshape(height, width, 4)
+    
+    def release(self):
+        """Free the GDI objects"""
+        # Delete the memory DC first: the bitmap is still selected into it and
+        # DeleteObject fails on a selected bitmap
+        if self._mem_dc is not None:
+            self._mem_dc.DeleteDC()
+            self._src_dc.DeleteDC()
+            win32gui.ReleaseDC(0, self._screen_hdc)
+            self._mem_dc = self._src_dc = self._screen_hdc = None
+        if self._bitmap is not None:
+            win32gui.DeleteObject(self._bitmap.GetHandle())
+            self._bitmap = None
+        self._size = (0, 0)
+
 class DigimonDetector:
     """Advanced computer vision detector with optimization and threading"""
     
@@ -58,6 +399,7 @@ class DigimonDetector:
         
         # Window management
         self.game_window_region = None
+        self._window_center: Optional[Tuple[int, int]] = None
         self.window_title = ""
         self.detected_windows = []
         self.active_window_hwnd = None
@@ -67,20 +409,44 @@ class DigimonDetector:
         self.last_screenshot = None
         self.last_screenshot_time = 0
         self.screenshot_cache_duration = 0.033  # ~30 FPS
+        self.screen_capture = ScreenCapture()
+        # Window-relative position of the last capture's top-left corner
+        self.last_capture_offset = (0, 0)
+        # HSV working images keyed by frame shape, reused by every pass. ROI
+        # captures cycle through four shapes (center, horizontal strips,
+        # vertical strips, whole window); older shapes left behind by a
+        # resize or mode change are evicted beyond that
+        self._hsv_buffers: Dict[Tuple[int, ...], np.ndarray] = {}
+        self.max_hsv_buffers = 4
         
         # Threading and performance
-        self.executor = ThreadPoolExecutor(max_workers=2) if CV_AVAILABLE else None
-        self.detection_future: Optional[Future] = None
+        # A long-lived worker runs passes back to back and publishes each
+        # result list with a single reference store; readers never block
+        self._worker: Optional[threading.Thread] = None
+        self._worker_stop = threading.Event()
+        self._worker_wake = threading.Event()
+        self._last_request_time = 0.0
+        self._worker_parked = False
+        # Park the worker when nobody is reading; detect_entities() widens this
+        # to a few of the slowest caller's poll interval
+        self.worker_idle_timeout = 1.0
+        self._latest_entities: List[DetectedEntity] = []
+        # Start time of the pass behind _latest_entities; forced requests wait
+        # on the condition for a pass that started after they asked
+        self._latest_pass_start = 0.0
+        self._pass_done = threading.Condition()
+        self.force_detection_timeout = 0.5
         self.detection_lock = threading.Lock()
         
         # Detection history and stability
-        self.detection_history = []
         self.max_history = 50
+        self.detection_history = DetectionHistory(self.max_history)
         self.entity_tracking = {}
         
         # Performance metrics
-        self.detection_times = []
         self.max_detection_times = 100
+        self.detection_times = deque(maxlen=self.max_detection_times)
+        self._detection_time_sum = 0.0
         self.total_detections = 0
         self.successful_detections = 0
         
@@ -88,10 +454,27 @@ class DigimonDetector:
         self.performance_mode = "balanced"  # "fast", "balanced", "quality"
         self.auto_roi_enabled = True
         self.detection_interval = 0.1
+        # Run the per-frame filters as OpenCL (UMat) kernels; see toggle_opencl()
+        self.use_opencl = False
         
-        if not CV_AVAILABLE:
+        if CV_AVAILABLE:
+            self._tune_opencv()
+        else:
             self.logger.warning("Computer vision not available - detection disabled")
     
+    def _tune_opencv(self):
+        """Enable OpenCV's optimized code paths and cap its thread pool"""
+        try:
+            cv2.setUseOptimized(True)
+            cv2.ipp.setUseIPP(True)
+            # Leave cores for the game, the engine loop and the capture worker
+            physical_cores = psutil.cpu_count(logical=False) or 1
+            cv2.setNumThreads(min(physical_cores, 4))
+            self.logger.info(f"OpenCV tuned: optimized={cv2.useOptimized()}, "
+                             f"IPP={cv2.ipp.useIPP()}, threads={cv2.getNumThreads()}")
+        except Exception as e:
+            self.logger.warning(f"Could not tune OpenCV: {e}")
+    
     def initialize(self) -> bool:
         """Initialize the detection system"""
         if not self.detection_enabled:
@@ -132,7 +515,7 @@ class DigimonDetector:
                         _, pid = win32process.GetWindowThreadProcessId(hwnd)
                         process = psutil.Process(pid)
                         process_name = process.name().lower()
-                    except:
+                    except (psutil.Error, OSError):
                         process_name = "unknown"
                     
                     # Check if this looks like a game window
@@ -211,6 +594,7 @@ class DigimonDetector:
                 rect[3] > rect[1]):
                 
                 self.game_window_region = rect
+                self._window_center = ((rect[2] - rect[0]) // 2, (rect[3] - rect[1]) // 2)
                 self.window_title = title
                 self.active_window_hwnd = hwnd
                 
@@ -237,8 +621,12 @@ class DigimonDetector:
         height = bottom - y
         
         # Create initial ROI regions
-        # Center region (highest priority)
-        center_w, center_h = width // 3, height // 3
+        # Center region (highest priority); captures are full resolution, so
+        # the performance mode trades coverage through its area instead:
+        # a sixth of the window for fast, a third for balanced, all of it
+        # for quality. Each side scales by the square root of that fraction.
+        side_scale = math.sqrt({"fast": 1 / 6, "balanced": 1 / 3}.get(self.performance_mode, 1.0))
+        center_w, center_h = int(width * side_scale), int(height * side_scale)
         center_x = x + (width - center_w) // 2
         center_y = y + (height - center_h) // 2
         
@@ -249,10 +637,14 @@ class DigimonDetector:
             DetectionRegion(x, y, width // 3, height, 4),  # Left region
             DetectionRegion(x + width * 2 // 3, y, width // 3, height, 4),  # Right region
         ]
+        # Kept in priority order so captures can scan it without sorting
+        self.roi_regions.sort(key=lambda r: r.priority)
     
-    def get_optimized_screenshot(self, force_new: bool = False) -> Optional[np.ndarray]:
+    def get_optimized_screenshot(self, force_new: bool = False,
+                                 current_time: Optional[float] = None) -> Optional[np.ndarray]:
         """Get screenshot with caching optimization"""
-        current_time = time.time()
+        if current_time is None:
+            current_time = monotonic()
         
         # Use cached screenshot if recent enough
         if (not force_new and self.last_screenshot is not None and 
@@ -267,7 +659,7 @@ class DigimonDetector:
             if self.auto_roi_enabled and self.roi_regions:
                 # Use highest priority ROI that hasn't been checked recently
                 capture_region = None
-                for roi in sorted(self.roi_regions, key=lambda r: r.priority):
+                for roi in self.roi_regions:  # already in priority order
                     if current_time - roi.last_detection > self.detection_interval:
                         capture_region = (roi.x, roi.y, roi.x + roi.width, roi.y + roi.height)
                         roi.last_detection = current_time
@@ -278,19 +670,13 @@ class DigimonDetector:
             else:
                 capture_region = self.game_window_region
             
-            # Capture screenshot
-            screenshot = ImageGrab.grab(bbox=capture_region)
+            # Capture screenshot at full resolution
+            screenshot = self.screen_capture.grab(capture_region)
+            window_x, window_y = self.game_window_region[:2]
+            self.last_capture_offset = (capture_region[0] - window_x, capture_region[1] - window_y)
             
-            # Resize for performance if needed
-            if self.performance_mode == "fast":
-                new_size = (screenshot.width // 3, screenshot.height // 3)
-                screenshot = screenshot.resize(new_size)
-            elif self.performance_mode == "balanced":
-                new_size = (screenshot.width // 2, screenshot.height // 2)
-                screenshot = screenshot.resize(new_size)
-            
-            # Convert to OpenCV format
-            cv_image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            # Drop the alpha channel for OpenCV's BGR pipeline
+            cv_image = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2BGR)
             
             # Cache the screenshot
             self.last_screenshot = cv_image
@@ -302,68 +688,133 @@ class DigimonDetector:
             self.logger.error(f"Screenshot capture failed: {e}")
             return None
     
-    def detect_entities(self, force_detection: bool = False) -> List[DetectedEntity]:
+    def detect_entities(self, force_detection: bool = False,
+                        poll_interval: Optional[float] = None) -> List[DetectedEntity]:
         """
-        Detect entities in the game window
+        Get the latest detected entities in the game window
         
         Args:
-            force_detection: Force immediate detection, bypassing timing checks
+            force_detection: Wake the worker for an immediate pass and wait
+                up to force_detection_timeout for its result; on timeout the
+                previous result is returned
+            poll_interval: How often the caller asks for results, so the
+                worker doesn't park between two of its reads. The idle
+                timeout follows the slowest interval any caller has given
         """
         if not self.detection_enabled or not self.game_window_region:
             return []
         
-        current_time = time.time()
-        
-        # Check if detection is needed
-        if (not force_detection and self.detection_future and 
-            not self.detection_future.done()):
-            return self._get_recent_detections()
+        if poll_interval is not None and poll_interval * 4 > self.worker_idle_timeout:
+            self.worker_idle_timeout = poll_interval * 4
+        requested = self._last_request_time = monotonic()
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            self._start_worker()
+        elif force_detection or self._worker_parked:
+            self._worker_wake.set()
         
-        # Start new detection
-        self.detection_future = self.executor.submit(self._perform_detection)
+        if force_detection:
+            with self._pass_done:
+                self._pass_done.wait_for(lambda: self._latest_pass_start >= requested,
+                                         self.force_detection_timeout)
+        return self._latest_entities
+    
+    def _start_worker(self):
+        """Start the detection worker thread"""
+        self._worker_stop.clear()
+        self._worker = threading.Thread(target=self._detection_loop, name="detector", daemon=True)
+        self._worker.start()
+    
+    def _detection_loop(self):
+        """Worker: run a pass every detection_interval while results are being read"""
+        stop = self._worker_stop
+        wake = self._worker_wake
+        _boost_current_thread(self.logger)
         
-        try:
-            # Wait for detection with timeout
-            entities = self.detection_future.result(timeout=0.2)
-            return entities
-        except:
-            # Return recent detections if current detection fails/times out
-            return self._get_recent_detections()
+        while not stop.is_set():
+            started = monotonic()
+            if started - self._last_request_time > self.worker_idle_timeout:
+                # Nobody has asked for results lately; park until detect_entities().
+                # Flag first, then re-check, so a request racing with this is
+                # either seen here or wakes the wait. The last result stays
+                # published so the request that wakes us doesn't get nothing
+                self._worker_parked = True
+                if monotonic() - self._last_request_time > self.worker_idle_timeout:
+                    wake.wait(self.worker_idle_timeout)
+                wake.clear()
+                self._worker_parked = False
+                continue
+            
+            if self.detection_enabled and self.game_window_region:
+                entities = self._perform_detection()
+                with self._pass_done:
+                    self._latest_entities = entities
+                    self._latest_pass_start = started
+                    self._pass_done.notify_all()
+            
+            wake.wait(max(0.0, self.detection_interval - (monotonic() - started)))
+            wake.clear()
+    
+    def _stop_worker(self):
+        self._worker_stop.set()
+        self._worker_wake.set()
+        if self._worker:
+            self._worker.join(timeout=2)
+            self._worker = None
     
     def _perform_detection(self) -> List[DetectedEntity]:
         """Perform the actual entity detection"""
-        detection_start = time.time()
+        # Read the clock once and thread it through the whole pass
+        detection_start = monotonic()
         
         try:
             # Get screenshot
-            screenshot = self.get_optimized_screenshot()
+            screenshot = self.get_optimized_screenshot(current_time=detection_start)
             if screenshot is None:
                 return []
             
-            # Convert to HSV for color detection
-            hsv = cv2.cvtColor(screenshot, cv2.COLOR_BGR2HSV)
-            
-            # Apply slight blur to reduce noise
-            hsv = cv2.GaussianBlur(hsv, (3, 3), 0)
+            if self.use_opencl:
+                # Same conversion and blur on the GPU; the mask stages below
+                # accept the UMat too
+                hsv = cv2.cvtColor(cv2.UMat(screenshot), cv2.COLOR_BGR2HSV)
+                hsv = cv2.sepFilter2D(hsv, -1, GAUSSIAN_KERNEL, GAUSSIAN_KERNEL)
+            else:
+                # Convert to HSV for color detection. The screenshot is already
+                # the ROI crop, so both passes only touch ROI pixels
+                hsv = self._hsv_buffers.get(screenshot.shape)
+                if hsv is None:
+                    hsv_buffers = self._hsv_buffers
+                    if len(hsv_buffers) >= self.max_hsv_buffers:
+                        # Oldest first: dicts keep insertion order
+                        del hsv_buffers[next(iter(hsv_buffers))]
+                    hsv = np.empty_like(screenshot)
+                    hsv_buffers[screenshot.shape] = hsv
+                cv2.cvtColor(screenshot, cv2.COLOR_BGR2HSV, dst=hsv)
+                
+                # Apply slight blur to reduce noise, in place
+                cv2.sepFilter2D(hsv, -1, GAUSSIAN_KERNEL, GAUSSIAN_KERNEL, dst=hsv)
             
             detected_entities = []
             
             # Process each entity type
             for entity_type, config in DIGIMON_COLOR_PROFILES.items():
-                entities = self._detect_entity_type(hsv, entity_type, config)
+                entities = self._detect_entity_type(hsv, entity_type, config, detection_start)
                 detected_entities.extend(entities)
             
             # Filter and validate detections
-            filtered_entities = self._filter_and_validate_detections(detected_entities)
+            filtered_entities = self._filter_and_validate_detections(detected_entities, detection_start)
             
             # Update detection history
-            self._update_detection_history(filtered_entities)
+            self._update_detection_history(filtered_entities, detection_start)
             
             # Track performance
-            detection_time = time.time() - detection_start
-            self.detection_times.append(detection_time)
-            if len(self.detection_times) > self.max_detection_times:
-                self.detection_times.pop(0)
+            detection_time = monotonic() - detection_start
+            detection_times = self.detection_times
+            if len(detection_times) == detection_times.maxlen:
+                # Subtract the sample the deque is about to evict
+                self._detection_time_sum -= detection_times[0]
+            detection_times.append(detection_time)
+            self._detection_time_sum += detection_time
             
             self.total_detections += 1
             if filtered_entities:
@@ -379,78 +830,91 @@ class DigimonDetector:
             self.logger.error(f"Detection error: {e}")
             return []
     
-    def _detect_entity_type(self, hsv_image: np.ndarray, entity_type: str, config: Dict) -> List[DetectedEntity]:
+    def _detect_entity_type(self, hsv_image: Any, entity_type: str, config: Dict,
+                            current_time: float) -> List[DetectedEntity]:
         """Detect entities of a specific type"""
         try:
-            # Create combined mask for all color ranges
+            # Create combined mask for all color ranges, OR-ing in place
             combined_mask = None
+            mask = None
             
-            for color_range in config['colors']:
-                lower, upper = color_range
-                mask = cv2.inRange(hsv_image, np.array(lower), np.array(upper))
-                
-                # Morphological operations to clean up mask
-                kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-                mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-                mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-                
-                if combined_mask is None:
-                    combined_mask = mask
-                else:
-                    combined_mask = cv2.bitwise_or(combined_mask, mask)
+            bounds = COLOR_BOUNDS.get(entity_type)
+            if bounds is None:
+                bounds = _color_bounds(config)
+            
+            if NUMBA_AVAILABLE and bounds and isinstance(hsv_image, np.ndarray):
+                # One parallel pass over the frame for all ranges
+                stacked = STACKED_COLOR_BOUNDS.get(entity_type) or _stack_bounds(bounds)
+                combined_mask = np.empty(hsv_image.shape[:2], dtype=np.uint8)
+                _hsv_multi_inrange(hsv_image, *stacked, combined_mask)
+            else:
+                for lower, upper in bounds:
+                    if combined_mask is None:
+                        combined_mask = cv2.inRange(hsv_image, lower, upper)
+                    else:
+                        mask = cv2.inRange(hsv_image, lower, upper, dst=mask)
+                        cv2.bitwise_or(combined_mask, mask, dst=combined_mask)
             
             if combined_mask is None:
                 return []
             
-            # Find contours
-            contours, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            # Clean up the union in one pass: on a binary mask a 3x3 median is a
+            # majority vote, which drops isolated specks and fills pinholes like
+            # close+open did, without the four dilate/erode passes
+            combined_mask = cv2.medianBlur(combined_mask, 3)
+            
+            if isinstance(combined_mask, cv2.UMat):
+                # Labelling has no OpenCL path; download the mask once
+                combined_mask = combined_mask.get()
+            
+            # Label blobs; bounding boxes and areas for all of them come back
+            # in one array instead of a Python round-trip per contour
+            _, labels, stats, _ = cv2.connectedComponentsWithStats(combined_mask, connectivity=8,
+                                                                   ltype=cv2.CV_32S)
             
             entities = []
             min_area = config.get('min_area', 50)
             max_area = config.get('max_area', 5000)
+            offset_x, offset_y = self.last_capture_offset
+            type_id = ENTITY_TYPE_IDS.get(entity_type, -1)
+            
+            # Row 0 is the background; filter the rest by area in one pass
+            areas = stats[1:, cv2.CC_STAT_AREA]
+            candidates = np.flatnonzero((areas >= min_area) & (areas <= max_area)) + 1
             
-            for contour in contours:
-                area = cv2.contourArea(contour)
+            for label in candidates:
+                x, y, w, h, area = (int(v) for v in stats[label])
+                component = (labels[y:y+h, x:x+w] == label).view(np.uint8)
                 
-                if min_area <= area <= max_area:
-                    # Get bounding rectangle
-                    x, y, w, h = cv2.boundingRect(contour)
-                    
-                    # Calculate center point
-                    center_x = x + w // 2
-                    center_y = y + h // 2
-                    
-                    # Adjust coordinates based on performance scaling
-                    scale_factor = self._get_scale_factor()
-                    center_x = int(center_x * scale_factor)
-                    center_y = int(center_y * scale_factor)
-                    w = int(w * scale_factor)
-                    h = int(h * scale_factor)
-                    
-                    # Calculate distance from center
-                    distance = self._calculate_distance_from_center(center_x, center_y)
-                    
-                    # Calculate confidence score
-                    confidence = self._calculate_confidence(contour, area, min_area, max_area)
-                    
-                    # Calculate color match score
-                    color_score = self._calculate_color_match_score(hsv_image, x, y, w, h, config)
-                    
-                    # Create entity
-                    entity = DetectedEntity(
-                        entity_type=entity_type,
-                        x=center_x,
-                        y=center_y,
-                        width=w,
-                        height=h,
-                        confidence=confidence,
-                        distance_from_center=distance,
-                        area=area,
-                        timestamp=time.time(),
-                        color_match_score=color_score
-                    )
-                    
-                    entities.append(entity)
+                # Calculate color match score from the mask already built
+                color_score = self._calculate_color_match_score(combined_mask, x, y, w, h)
+                
+                # Calculate center point, relative to the game window
+                center_x = offset_x + x + w // 2
+                center_y = offset_y + y + h // 2
+                
+                # Calculate distance from center
+                distance = self._calculate_distance_from_center(center_x, center_y)
+                
+                # Calculate confidence score
+                confidence = self._calculate_confidence(component, area, min_area, max_area)
+                
+                # Create entity
+                entity = DetectedEntity(
+                    entity_type=entity_type,
+                    x=center_x,
+                    y=center_y,
+                    width=w,
+                    height=h,
+                    confidence=confidence,
+                    distance_sq_from_center=distance,
+                    area=area,
+                    timestamp=current_time,
+                    color_match_score=color_score,
+                    type_id=type_id
+                )
+                
+                entities.append(entity)
             
             return entities
             
@@ -458,80 +922,57 @@ class DigimonDetector:
             self.logger.error(f"Error detecting {entity_type}: {e}")
             return []
     
-    def _get_scale_factor(self) -> float:
-        """Get current scale factor based on performance mode"""
-        if self.performance_mode == "fast":
-            return 3.0
-        elif self.performance_mode == "balanced":
-            return 2.0
-        else:
-            return 1.0
-    
     def _calculate_distance_from_center(self, x: int, y: int) -> float:
-        """Calculate distance from center of game window"""
-        if not self.game_window_region:
+        """Squared distance from center of game window"""
+        if self._window_center is None:
             return float('inf')
         
-        window_x, window_y, window_right, window_bottom = self.game_window_region
-        center_x = (window_right - window_x) // 2
-        center_y = (window_bottom - window_y) // 2
-        
-        return ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
+        dx = x - self._window_center[0]
+        dy = y - self._window_center[1]
+        return dx * dx + dy * dy
     
-    def _calculate_confidence(self, contour, area: int, min_area: int, max_area: int) -> float:
-        """Calculate confidence score for detection"""
+    def _calculate_confidence(self, component: np.ndarray, area: int, min_area: int, max_area: int) -> float:
+        """Calculate confidence score for a labelled blob (component is its 0/1 mask in its bounding box)"""
         try:
             # Area-based confidence
             area_ratio = (area - min_area) / (max_area - min_area)
             area_confidence = min(1.0, area_ratio * 2)  # Peak at 50% of range
             
-            # Shape-based confidence (solidity)
-            hull = cv2.convexHull(contour)
-            hull_area = cv2.contourArea(hull)
-            solidity = area / hull_area if hull_area > 0 else 0
-            
             # Aspect ratio confidence
-            x, y, w, h = cv2.boundingRect(contour)
+            h, w = component.shape
             aspect_ratio = w / h if h > 0 else 0
             aspect_confidence = 1.0 - abs(aspect_ratio - 1.0)  # Prefer square-ish shapes
             aspect_confidence = max(0.3, aspect_confidence)  # Minimum confidence
             
+            # Shape-based confidence (solidity). A blob that fills its box
+            # (bars, nameplates) is convex already
+            if area >= w * h:
+                solidity = 1.0
+            else:
+                contours, _ = cv2.findContours(component, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                hull_area = cv2.contourArea(cv2.convexHull(max(contours, key=len))) if contours else 0
+                solidity = min(1.0, area / hull_area) if hull_area > 0 else 0
+            
             # Combine confidence factors
-            total_confidence = (area_confidence * 0.4 + 
-                              solidity * 0.4 + 
-                              aspect_confidence * 0.2)
+            total_confidence = (area_confidence * 0.4 + aspect_confidence * 0.2 +
+                                solidity * 0.4)
             
             return min(1.0, max(0.1, total_confidence))
             
-        except:
+        except Exception:
             return 0.5  # Default confidence
     
-    def _calculate_color_match_score(self, hsv_image: np.ndarray, x: int, y: int, w: int, h: int, config: Dict) -> float:
+    def _calculate_color_match_score(self, mask: np.ndarray, x: int, y: int, w: int, h: int) -> float:
         """Calculate how well the detected region matches expected colors"""
-        try:
-            # Extract region
-            region = hsv_image[y:y+h, x:x+w]
-            if region.size == 0:
-                return 0.0
-            
-            # Calculate color distribution
-            total_pixels = region.shape[0] * region.shape[1]
-            matching_pixels = 0
-            
-            for color_range in config['colors']:
-                lower, upper = color_range
-                mask = cv2.inRange(region, np.array(lower), np.array(upper))
-                matching_pixels += cv2.countNonZero(mask)
-            
-            # Calculate match percentage
-            match_score = matching_pixels / total_pixels if total_pixels > 0 else 0
-            return min(1.0, match_score)
-            
-        except Exception as e:
-            self.logger.error(f"Color match calculation error: {e}")
-            return 0.5  # Default score
+        # The combined color mask already marks every matching pixel, so
+        # the score is just its fill ratio over the region
+        region = mask[y:y+h, x:x+w]
+        if region.size == 0:
+            return 0.0
+        return cv2.countNonZero(region) / region.size
     
-    def _filter_and_validate_detections(self, entities: List[DetectedEntity]) -> List[DetectedEntity]:
+    def _filter_and_validate_detections(self, entities: List[DetectedEntity],
+                                        current_time: float) -> List[DetectedEntity]:
         """Filter and validate detected entities"""
         if not entities:
             return []
@@ -544,7 +985,7 @@ class DigimonDetector:
         filtered = self._remove_overlapping_detections(filtered)
         
         # Validate against history for stability
-        filtered = self._validate_against_history(filtered)
+        filtered = self._validate_against_history(filtered, current_time)
         
         # Sort by priority and confidence
         filtered.sort(key=lambda e: (
@@ -559,77 +1000,50 @@ class DigimonDetector:
         if len(entities) <= 1:
             return entities
         
-        filtered = []
-        for entity in sorted(entities, key=lambda e: e.confidence, reverse=True):
-            is_overlapping = False
-            
-            for existing in filtered:
-                # Check if entities overlap significantly
-                distance = ((entity.x - existing.x) ** 2 + (entity.y - existing.y) ** 2) ** 0.5
-                min_distance = max(entity.width, entity.height, existing.width, existing.height) / 2
-                
-                if distance < min_distance:
-                    is_overlapping = True
-                    break
-            
-            if not is_overlapping:
-                filtered.append(entity)
+        count = len(entities)
+        xs = np.fromiter((e.x for e in entities), dtype=np.float64, count=count)
+        ys = np.fromiter((e.y for e in entities), dtype=np.float64, count=count)
+        sizes = np.fromiter((max(e.width, e.height) for e in entities), dtype=np.float64, count=count)
+        confidences = np.fromiter((e.confidence for e in entities), dtype=np.float64, count=count)
         
-        return filtered
+        # Highest confidence first; stable so ties keep detection order
+        order = np.argsort(-confidences, kind='stable')
+        keep = suppress_overlaps(xs, ys, sizes, order)
+        return [entities[i] for i in order if keep[i]]
     
-    def _validate_against_history(self, entities: List[DetectedEntity]) -> List[DetectedEntity]:
+    def _validate_against_history(self, entities: List[DetectedEntity],
+                                  current_time: float) -> List[DetectedEntity]:
         """Validate detections against historical data for stability"""
-        if not self.detection_history:
+        if not self.detection_history or not entities:
             return entities
         
         # Get recent detections
-        recent_time = time.time() - 2.0  # Last 2 seconds
-        recent_detections = [
-            detection for detection in self.detection_history 
-            if detection.timestamp > recent_time
-        ]
-        
-        if not recent_detections:
+        history = self.detection_history
+        recent = history.columns(history.first_after(current_time - 2.0))  # Last 2 seconds
+        if not recent[0].size:
             return entities
         
+        scores = history_stability(*_entity_arrays(entities), *recent)
+        
         validated = []
-        for entity in entities:
-            # Check if similar detection exists in recent history
-            stability_score = 0.0
-            
-            for historical in recent_detections:
-                if historical.entity_type == entity.entity_type:
-                    distance = ((entity.x - historical.x) ** 2 + (entity.y - historical.y) ** 2) ** 0.5
-                    
-                    if distance < 100:  # Close enough to be same entity
-                        time_diff = entity.timestamp - historical.timestamp
-                        stability_score = max(stability_score, 1.0 - (time_diff / 2.0))
-            
+        excellent_confidence = DETECTION_THRESHOLDS['excellent_confidence']
+        for entity, stability_score in zip(entities, scores.tolist()):
             entity.stability_score = stability_score
             
             # Include if stable or high confidence
-            if stability_score > 0.3 or entity.confidence > DETECTION_THRESHOLDS['excellent_confidence']:
+            if stability_score > 0.3 or entity.confidence > excellent_confidence:
                 validated.append(entity)
         
         return validated
     
-    def _update_detection_history(self, entities: List[DetectedEntity]):
+    def _update_detection_history(self, entities: List[DetectedEntity], current_time: float):
         """Update detection history with new entities"""
-        current_time = time.time()
-        
-        # Add new detections
-        self.detection_history.extend(entities)
-        
-        # Remove old detections
-        cutoff_time = current_time - 10.0  # Keep 10 seconds of history
-        self.detection_history = [
-            detection for detection in self.detection_history 
-            if detection.timestamp > cutoff_time
-        ]
-        
-        # Limit history size
-        if len(self.detection_history) > self.max_history:
-            self.detection_history = self.detection_history[-self.max_history:]
+        # Only the detection worker reads and writes the history; the lock just
+        # guards against cleanup() clearing it if the worker outlives its join
+        history = self.detection_history
+        with self.detection_lock:
+            history.extend(entities)
+            history.expire(current_time - 10.0)  # Keep 10 seconds of history
     
     def _update_roi_regions(self, entities: List[DetectedEntity]):
         """Update ROI regions based on recent detections"""
@@ -648,31 +1062,21 @@ class DigimonDetector:
             
             # Update center ROI to focus on activity area
             if self.roi_regions and self.game_window_region:
+                # Entity positions are window-relative; ROIs are in screen space
                 roi_size = 200
-                new_x = max(self.game_window_region[0], int(avg_x - roi_size // 2))
-                new_y = max(self.game_window_region[1], int(avg_y - roi_size // 2))
+                window_x, window_y = self.game_window_region[:2]
+                new_x = window_x + max(0, int(avg_x - roi_size // 2))
+                new_y = window_y + max(0, int(avg_y - roi_size // 2))
                 
+                # Priority 1 is the minimum, so slot 0 keeps the list ordered
                 self.roi_regions[0] = DetectionRegion(new_x, new_y, roi_size, roi_size, 1)
     
-    def _get_recent_detections(self) -> List[DetectedEntity]:
-        """Get recent detections from history"""
-        if not self.detection_history:
-            return []
-        
-        recent_time = time.time() - 0.5  # Last 0.5 seconds
-        return [
-            detection for detection in self.detection_history 
-            if detection.timestamp > recent_time
-        ]
-    
     def get_movement_direction(self, target_x: int, target_y: int) -> List[str]:
         """Get movement directions to reach target"""
-        if not self.game_window_region:
+        if self._window_center is None:
             return []
         
-        window_x, window_y, window_right, window_bottom = self.game_window_region
-        center_x = (window_right - window_x) // 2
-        center_y = (window_bottom - window_y) // 2
+        center_x, center_y = self._window_center
         
         movements = []
         threshold = 50  # Minimum distance to trigger movement
@@ -692,7 +1096,7 @@ class DigimonDetector:
         """Get detection system performance statistics"""
         avg_detection_time = 0
         if self.detection_times:
-            avg_detection_time = sum(self.detection_times) / len(self.detection_times)
+            avg_detection_time = self._detection_time_sum / len(self.detection_times)
         
         success_rate = 0
         if self.total_detections > 0:
@@ -709,6 +1113,7 @@ class DigimonDetector:
             'detection_fps': 1.0 / avg_detection_time if avg_detection_time > 0 else 0,
             'performance_mode': self.performance_mode,
             'roi_enabled': self.auto_roi_enabled,
+            'opencl_enabled': self.use_opencl,
             'active_roi_regions': len(self.roi_regions),
             'history_size': len(self.detection_history)
         }
@@ -726,6 +1131,10 @@ class DigimonDetector:
                 self.detection_interval = 0.1   # 10 FPS
             else:  # quality
                 self.detection_interval = 0.2   # 5 FPS
+            
+            # The mode sets the center ROI size
+            if self.auto_roi_enabled and self.game_window_region:
+                self._initialize_roi_regions()
     
     def toggle_roi_optimization(self, enabled: bool):
         """Toggle ROI optimization"""
@@ -737,16 +1146,32 @@ class DigimonDetector:
         
         self.logger.info(f"ROI optimization {'enabled' if enabled else 'disabled'}")
     
+    def toggle_opencl(self, enabled: bool) -> bool:
+        """Toggle OpenCL offload of the color filtering; returns the resulting state"""
+        if enabled and not (CV_AVAILABLE and cv2.ocl.haveOpenCL()):
+            self.logger.warning("OpenCL not available - keeping CPU detection")
+            enabled = False
+        
+        if CV_AVAILABLE:
+            cv2.ocl.setUseOpenCL(enabled)
+        self.use_opencl = enabled
+        
+        self.logger.info(f"OpenCL detection {'enabled' if enabled else 'disabled'}")
+        return enabled
+    
     def cleanup(self):
         """Clean up detection system resources"""
         try:
-            if self.executor:
-                self.executor.shutdown(wait=True)
-                self.executor = None
+            self._stop_worker()
+            self._latest_entities = []
+            
+            self.screen_capture.release()
+            self._hsv_buffers.clear()
             
             # Clear caches
             self.last_screenshot = None
-            self.detection_history = []
+            with self.detection_lock:
+                self.detection_history.clear()
             self.roi_regions = []
             
             self.logger.info("Detection system cleaned up")
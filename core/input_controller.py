@@ -3,10 +3,13 @@ Fixed Input Controller for GDMO Bot
 Handles keyboard input with proper thread safety and error handling
 """
 
+import sys
 import time
+import ctypes
 import threading
 import logging
-from typing import Dict, Set, Optional
+from types import MappingProxyType
+from typing import Dict, Set, FrozenSet, Mapping, Optional, Tuple, Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +17,90 @@ logger = logging.getLogger(__name__)
 WIN32_AVAILABLE = False
 try:
     import win32api
+    # Bound once; every press and release goes through it
+    _send_input = ctypes.windll.user32.SendInput
     WIN32_AVAILABLE = True
 except ImportError:
     logger.warning("win32api not available - input features disabled")
 
+# fastrlock's reentrant lock is cheaper to take uncontended, which is the
+# usual case here; threading.RLock behaves the same otherwise
+try:
+    from fastrlock.rlock import FastRLock as _RLock
+except ImportError:
+    _RLock = threading.RLock
+
+KEYEVENTF_KEYDOWN = 0x0000  # no flag; named for symmetry with KEYUP
+KEYEVENTF_KEYUP = 0x0002
+INPUT_KEYBOARD = 1
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", ctypes.c_ushort), ("wScan", ctypes.c_ushort),
+                ("dwFlags", ctypes.c_ulong), ("time", ctypes.c_ulong),
+                ("dwExtraInfo", ctypes.c_size_t)]
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    # Only here so the union, and so sizeof(INPUT), matches Windows
+    _fields_ = [("dx", ctypes.c_long), ("dy", ctypes.c_long),
+                ("mouseData", ctypes.c_ulong), ("dwFlags", ctypes.c_ulong),
+                ("time", ctypes.c_ulong), ("dwExtraInfo", ctypes.c_size_t)]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_ulong), ("union", _INPUTUNION)]
+
+
+_INPUT_SIZE = ctypes.sizeof(_INPUT)
+
+
+def _key_input(vk_code: int, flags: int) -> _INPUT:
+    """A keyboard INPUT for one key event"""
+    event = _INPUT()
+    event.type = INPUT_KEYBOARD
+    event.union.ki.wVk = vk_code
+    event.union.ki.dwFlags = flags
+    return event
+
+
+def send_key_events(vk_codes: Iterable[int], flags: int = 0) -> int:
+    """
+    Send one keyboard event per VK code in a single SendInput call
+    
+    Args:
+        vk_codes: Virtual key codes, in the order to send them
+        flags: KEYBDINPUT flags shared by every event (e.g. KEYEVENTF_KEYUP)
+        
+    Returns:
+        Number of events Windows accepted
+    """
+    return _send_inputs([(vk_code, flags) for vk_code in vk_codes])
+
+
+def send_key_strokes(vk_codes: Iterable[int]) -> int:
+    """
+    Press and release each VK code in turn, all in a single SendInput call
+    
+    Args:
+        vk_codes: Virtual key codes, in the order to tap them
+        
+    Returns:
+        Number of events Windows accepted (two per key)
+    """
+    return _send_inputs([(vk_code, flags) for vk_code in vk_codes
+                         for flags in (KEYEVENTF_KEYDOWN, KEYEVENTF_KEYUP)])
+
+
+def _send_inputs(key_events) -> int:
+    """Send (vk_code, flags) keyboard events in one SendInput call"""
+    events = (_INPUT * len(key_events))(*(_key_input(vk_code, flags) for vk_code, flags in key_events))
+    return _send_input(len(events), events, _INPUT_SIZE)
+
 
 class InputController:
     """Enhanced input controller with thread safety and error handling"""
@@ -37,14 +120,31 @@ class InputController:
         # Arrow keys
         "UP": 0x26, "DOWN": 0x28, "LEFT": 0x25, "RIGHT": 0x27,
     }
+    # Every distinct code above, for releasing all keys at once
+    ALL_VK_CODES = tuple(sorted(set(VK_CODES.values())))
+    # Ready-made INPUTs for pressing and releasing each key, so single key
+    # events don't build ctypes structures at runtime
+    _KEY_INPUTS = {
+        (vk_code, flags): _key_input(vk_code, flags)
+        for vk_code in ALL_VK_CODES
+        for flags in (KEYEVENTF_KEYDOWN, KEYEVENTF_KEYUP)
+    }
+    # Resolutions for every name as listed and in lowercase, so common
+    # spellings never reach upper() or a second lookup
+    _PRESOLVED_KEYS = {
+        **{name.lower(): (name, vk_code) for name, vk_code in VK_CODES.items()},
+        **{name: (name, vk_code) for name, vk_code in VK_CODES.items()},
+    }
     
     def __init__(self):
-        self.held_keys: Set[str] = set()
-        self.hold_threads: Dict[str, threading.Thread] = {}
-        self.lock = threading.RLock()  # Use RLock for nested locking
+        # Immutable and rebound on every change (under the lock), so readers
+        # can check it without taking the lock
+        self.held_keys: FrozenSet[str] = frozenset()
+        self.lock = _RLock()  # Use RLock for nested locking
         self.enabled = WIN32_AVAILABLE
         self.key_press_delay = 0.05  # Default delay between key press/release
-        self.hold_check_interval = 0.01  # How often to check if we should stop holding
+        # Key name as passed -> (uppercase name, VK code); valid keys only
+        self._key_cache: Dict[str, Tuple[str, int]] = dict(self._PRESOLVED_KEYS)
         
         # Statistics
         self.stats = {
@@ -53,9 +153,21 @@ class InputController:
             'active_holds': 0,
             'errors': 0
         }
+        # Read-only live view handed out by get_stats()
+        self._stats_view = MappingProxyType(self.stats)
         
         if not WIN32_AVAILABLE:
             logger.error("win32api not available - input controller disabled")
+        
+        # Before 3.11, time.sleep on Windows rounds up to the ~15.6ms system
+        # tick, which swamps tap/hold durations; ask for a 1ms tick instead.
+        # 3.11+ sleeps on a high-resolution waitable timer already
+        self._timer_period_set = False
+        if WIN32_AVAILABLE and sys.version_info < (3, 11):
+            try:
+                self._timer_period_set = ctypes.windll.winmm.timeBeginPeriod(1) == 0
+            except (AttributeError, OSError) as e:
+                logger.debug("timeBeginPeriod unavailable: %s", e)
 
     def is_valid_key(self, key: str) -> bool:
         """
@@ -67,7 +179,7 @@ class InputController:
         Returns:
             True if key is valid, False otherwise
         """
-        return key.upper() in self.VK_CODES
+        return self._resolve(key)[1] is not None
 
     def get_vk_code(self, key: str) -> Optional[int]:
         """
@@ -79,7 +191,26 @@ class InputController:
         Returns:
             Virtual key code or None if invalid
         """
-        return self.VK_CODES.get(key.upper())
+        return self._resolve(key)[1]
+
+    def _send_key(self, vk_code: int, flags: int) -> None:
+        """Send one prebuilt key event"""
+        _send_input(1, ctypes.byref(self._KEY_INPUTS[vk_code, flags]), _INPUT_SIZE)
+
+    def _resolve(self, key: str) -> Tuple[str, Optional[int]]:
+        """Uppercase name and VK code of a key, folding both lookups into one"""
+        resolved = self._key_cache.get(key)
+        if resolved is None:
+            # Callers almost always pass names already in VK_CODES' case
+            key_upper = key
+            vk_code = self.VK_CODES.get(key)
+            if vk_code is None:
+                key_upper = key.upper()
+                vk_code = self.VK_CODES.get(key_upper)
+                if vk_code is None:
+                    return key_upper, None
+            resolved = self._key_cache[key] = (key_upper, vk_code)
+        return resolved
 
     def tap(self, key: str, delay: Optional[float] = None) -> bool:
         """
@@ -87,7 +218,8 @@ class InputController:
         
         Args:
             key: Key to tap
-            delay: Optional custom delay between press and release
+            delay: Optional custom delay between press and release;
+                0 sends press and release together in one call
             
         Returns:
             True if successful, False otherwise
@@ -99,31 +231,74 @@ class InputController:
         if delay is None:
             delay = self.key_press_delay
         
-        vk_code = self.get_vk_code(key)
+        key_upper, vk_code = self._resolve(key)
         if not vk_code:
-            logger.warning(f"Invalid key for tap: {key}")
+            logger.warning("Invalid key for tap: %s", key)
             return False
         
         try:
             with self.lock:
                 # Make sure key isn't currently being held
-                if key.upper() in self.held_keys:
-                    logger.warning(f"Cannot tap {key} - currently being held")
+                if key_upper in self.held_keys:
+                    logger.warning("Cannot tap %s - currently being held", key)
                     return False
                 
-                # Press key
-                win32api.keybd_event(vk_code, 0, 0, 0)
-                time.sleep(delay)
-                # Release key
-                win32api.keybd_event(vk_code, 0, 2, 0)  # 2 = KEYEVENTF_KEYUP
+                if delay > 0:
+                    # Press key
+                    self._send_key(vk_code, KEYEVENTF_KEYDOWN)
+                    time.sleep(delay)
+                    # Release key
+                    self._send_key(vk_code, KEYEVENTF_KEYUP)
+                else:
+                    send_key_strokes((vk_code,))
                 
                 self.stats['total_taps'] += 1
-                logger.debug(f"Tapped key: {key}")
+                logger.debug("Tapped key: %s", key)
+                return True
+                
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error("Error tapping key %s: %s", key, e)
+            return False
+
+    def tap_sequence(self, keys: Iterable[str]) -> bool:
+        """
+        Tap several keys back to back with no delay, in one SendInput call
+        
+        Args:
+            keys: Keys to tap, in order
+            
+        Returns:
+            True if successful, False otherwise (nothing is sent if any key
+            is invalid or held)
+        """
+        if not self.enabled:
+            logger.debug("Input controller disabled")
+            return False
+        
+        resolved = [self._resolve(key) for key in keys]
+        for key_upper, vk_code in resolved:
+            if not vk_code:
+                logger.warning("Invalid key for tap_sequence: %s", key_upper)
+                return False
+        
+        try:
+            with self.lock:
+                held = self.held_keys
+                for key_upper, _ in resolved:
+                    if key_upper in held:
+                        logger.warning("Cannot tap %s - currently being held", key_upper)
+                        return False
+                
+                send_key_strokes(vk_code for _, vk_code in resolved)
+                
+                self.stats['total_taps'] += len(resolved)
+                logger.debug("Tapped keys: %s", [key_upper for key_upper, _ in resolved])
                 return True
                 
         except Exception as e:
             self.stats['errors'] += 1
-            logger.error(f"Error tapping key {key}: {e}")
+            logger.error("Error tapping sequence: %s", e)
             return False
 
     def hold(self, key: str, duration: float = 0.4) -> bool:
@@ -141,31 +316,31 @@ class InputController:
             logger.debug("Input controller disabled")
             return False
         
-        vk_code = self.get_vk_code(key)
+        key_upper, vk_code = self._resolve(key)
         if not vk_code:
-            logger.warning(f"Invalid key for hold: {key}")
+            logger.warning("Invalid key for hold: %s", key)
             return False
         
         try:
             with self.lock:
                 # Make sure key isn't currently being held
-                if key.upper() in self.held_keys:
-                    logger.warning(f"Cannot hold {key} - already being held")
+                if key_upper in self.held_keys:
+                    logger.warning("Cannot hold %s - already being held", key)
                     return False
                 
                 # Press key
-                win32api.keybd_event(vk_code, 0, 0, 0)
+                self._send_key(vk_code, KEYEVENTF_KEYDOWN)
                 time.sleep(duration)
                 # Release key
-                win32api.keybd_event(vk_code, 0, 2, 0)
+                self._send_key(vk_code, KEYEVENTF_KEYUP)
                 
                 self.stats['total_holds'] += 1
-                logger.debug(f"Held key {key} for {duration}s")
+                logger.debug("Held key %s for %ss", key, duration)
                 return True
                 
         except Exception as e:
             self.stats['errors'] += 1
-            logger.error(f"Error holding key {key}: {e}")
+            logger.error("Error holding key %s: %s", key, e)
             return False
 
     def start_hold(self, key: str) -> bool:
@@ -182,10 +357,9 @@ class InputController:
             logger.debug("Input controller disabled")
             return False
         
-        key_upper = key.upper()
-        vk_code = self.get_vk_code(key_upper)
+        key_upper, vk_code = self._resolve(key)
         if not vk_code:
-            logger.warning(f"Invalid key for start_hold: {key}")
+            logger.warning("Invalid key for start_hold: %s", key)
             return False
         
         with self.lock:
@@ -194,51 +368,18 @@ class InputController:
                 self.stop_hold(key_upper)
             
             try:
-                # Add to held keys set
-                self.held_keys.add(key_upper)
-                
-                def hold_loop():
-                    """Thread function to maintain key hold"""
-                    try:
-                        # Press key down
-                        win32api.keybd_event(vk_code, 0, 0, 0)
-                        logger.debug(f"Started holding key: {key_upper}")
-                        
-                        # Keep checking if we should continue holding
-                        while key_upper in self.held_keys:
-                            time.sleep(self.hold_check_interval)
-                        
-                        # Release key
-                        win32api.keybd_event(vk_code, 0, 2, 0)
-                        logger.debug(f"Stopped holding key: {key_upper}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error in hold loop for {key_upper}: {e}")
-                        self.stats['errors'] += 1
-                    finally:
-                        # Ensure key is removed from held set
-                        with self.lock:
-                            self.held_keys.discard(key_upper)
-                            if key_upper in self.hold_threads:
-                                del self.hold_threads[key_upper]
-                
-                # Start the hold thread
-                hold_thread = threading.Thread(
-                    target=hold_loop,
-                    name=f"Hold-{key_upper}",
-                    daemon=True
-                )
-                self.hold_threads[key_upper] = hold_thread
-                hold_thread.start()
+                # Windows keeps the key down until its key-up event arrives,
+                # so a hold needs no thread to maintain it
+                self._send_key(vk_code, KEYEVENTF_KEYDOWN)
+                self.held_keys = self.held_keys | {key_upper}
+                logger.debug("Started holding key: %s", key_upper)
                 
                 self.stats['active_holds'] += 1
                 return True
                 
             except Exception as e:
-                # Clean up on error
-                self.held_keys.discard(key_upper)
                 self.stats['errors'] += 1
-                logger.error(f"Error starting hold for {key}: {e}")
+                logger.error("Error starting hold for %s: %s", key, e)
                 return False
 
     def stop_hold(self, key: Optional[str] = None) -> bool:
@@ -255,21 +396,20 @@ class InputController:
             try:
                 if key is None:
                     # Stop all held keys
-                    keys_to_stop = list(self.held_keys)
-                    for held_key in keys_to_stop:
+                    for held_key in self.held_keys:
                         self._stop_single_key(held_key)
                     logger.debug("Stopped holding all keys")
                 else:
                     # Stop specific key
-                    key_upper = key.upper()
+                    key_upper = self._resolve(key)[0]
                     self._stop_single_key(key_upper)
-                    logger.debug(f"Stopped holding key: {key_upper}")
+                    logger.debug("Stopped holding key: %s", key_upper)
                 
                 return True
                 
             except Exception as e:
                 self.stats['errors'] += 1
-                logger.error(f"Error stopping hold: {e}")
+                logger.error("Error stopping hold: %s", e)
                 return False
 
     def _stop_single_key(self, key_upper: str) -> None:
@@ -280,19 +420,13 @@ class InputController:
             key_upper: Uppercase key name to stop holding
         """
         if key_upper in self.held_keys:
-            # Remove from held keys set (this will stop the hold loop)
-            self.held_keys.discard(key_upper)
+            self.held_keys = self.held_keys - {key_upper}
             self.stats['active_holds'] = max(0, self.stats['active_holds'] - 1)
             
-            # Wait for thread to finish
-            if key_upper in self.hold_threads:
-                thread = self.hold_threads[key_upper]
-                thread.join(timeout=0.5)  # Wait up to 500ms
-                
-                if thread.is_alive():
-                    logger.warning(f"Hold thread for {key_upper} did not terminate cleanly")
-                else:
-                    del self.hold_threads[key_upper]
+            # Release key
+            vk_code = self.get_vk_code(key_upper)
+            if vk_code:
+                self._send_key(vk_code, KEYEVENTF_KEYUP)
 
     def emergency_release_all(self) -> None:
         """
@@ -304,24 +438,43 @@ class InputController:
         
         try:
             with self.lock:
-                # Try to release all currently held keys
-                for key_upper in list(self.held_keys):
-                    vk_code = self.get_vk_code(key_upper)
-                    if vk_code:
-                        try:
-                            win32api.keybd_event(vk_code, 0, 2, 0)  # Release
-                        except:
-                            pass
+                # Release all currently held keys in one batch. Held names
+                # are already uppercase and valid, so index VK_CODES directly
+                vk_codes = self.VK_CODES
+                try:
+                    send_key_events((vk_codes[key_upper] for key_upper in self.held_keys),
+                                    KEYEVENTF_KEYUP)
+                except Exception as e:
+                    logger.error("Error releasing held keys: %s", e)
                 
                 # Clear all tracking
-                self.held_keys.clear()
-                self.hold_threads.clear()
+                self.held_keys = frozenset()
                 self.stats['active_holds'] = 0
                 
                 logger.info("Emergency release of all keys completed")
                 
         except Exception as e:
-            logger.error(f"Error in emergency release: {e}")
+            logger.error("Error in emergency release: %s", e)
+
+    def stop_all_inputs(self) -> None:
+        """
+        Release every supported key, held or not, and clear hold tracking
+        Used by the combat and movement emergency stops
+        """
+        if not self.enabled:
+            return
+        
+        try:
+            with self.lock:
+                send_key_events(self.ALL_VK_CODES, KEYEVENTF_KEYUP)
+                
+                self.held_keys = frozenset()
+                self.stats['active_holds'] = 0
+                logger.info("Released all inputs")
+                
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error("Error stopping all inputs: %s", e)
 
     def get_held_keys(self) -> Set[str]:
         """
@@ -330,8 +483,7 @@ class InputController:
         Returns:
             Set of key names currently being held
         """
-        with self.lock:
-            return self.held_keys.copy()
+        return set(self.held_keys)
 
     def is_holding(self, key: str) -> bool:
         """
@@ -343,18 +495,17 @@ class InputController:
         Returns:
             True if key is being held, False otherwise
         """
-        with self.lock:
-            return key.upper() in self.held_keys
+        return self._resolve(key)[0] in self.held_keys
 
-    def get_stats(self) -> Dict[str, int]:
+    def get_stats(self) -> Mapping[str, int]:
         """
         Get input controller statistics
         
         Returns:
-            Dictionary with usage statistics
+            Read-only live view of the usage statistics; copy it with
+            dict() to keep a snapshot
         """
-        with self.lock:
-            return self.stats.copy()
+        return self._stats_view
 
     def cleanup(self) -> None:
         """Clean up all resources and stop all key holds"""
@@ -363,20 +514,15 @@ class InputController:
         # Emergency release all keys
         self.emergency_release_all()
         
-        # Wait for all threads to finish
-        for key, thread in list(self.hold_threads.items()):
-            try:
-                thread.join(timeout=1.0)
-                if thread.is_alive():
-                    logger.warning(f"Thread for {key} did not terminate within timeout")
-            except:
-                pass
-        
         # Clear all data
         with self.lock:
-            self.held_keys.clear()
-            self.hold_threads.clear()
+            self.held_keys = frozenset()
             self.stats['active_holds'] = 0
+            
+            # Restore the system timer resolution
+            if self._timer_period_set:
+                self._timer_period_set = False
+                ctypes.windll.winmm.timeEndPeriod(1)
         
         logger.info("Input controller cleanup completed")
 
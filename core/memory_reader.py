@@ -1,6 +1,7 @@
-import time
-import random
+import ctypes
 import logging
+from time import monotonic
+import struct
 import psutil
 
 logger = logging.getLogger(__name__)
@@ -12,6 +13,20 @@ try:
 except ImportError:
     logger.warning("Pymem not available - memory features disabled")
 
+# Plausibility limits for raw stat reads
+_STAT_MAX = 50000
+_STAT_TOLERANCE = 1.1  # current may briefly exceed max, e.g. mid-buff
+
+def _bind_read_process_memory():
+    """kernel32.ReadProcessMemory with pointer-sized argtypes, on a private WinDLL
+    so the prototypes don't leak into ctypes.windll"""
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    read = kernel32.ReadProcessMemory
+    read.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+                     ctypes.c_size_t, ctypes.c_void_p]
+    read.restype = ctypes.c_int
+    return read
+
 class MemoryReader:
     def __init__(self, process_name: str = "GDMO.exe"):
         self.process_name = process_name
@@ -20,12 +35,23 @@ class MemoryReader:
         self.base_address = None
         self.base_offset = 0x0072FF80
         self.offsets = {
-            'hp': [0x40, 0, 4, 8, 0x14, 0xAC, 0x80],
-            'max_hp': [0x40, 0, 4, 8, 0x14, 0xAC, 0x74],
-            'ds': [0x40, 0, 4, 8, 0x14, 0xAC, 0x84],
-            'max_ds': [0x40, 0, 4, 8, 0x14, 0xAC, 0x78]
+            'hp': (0x40, 0, 4, 8, 0x14, 0xAC, 0x80),
+            'max_hp': (0x40, 0, 4, 8, 0x14, 0xAC, 0x74),
+            'ds': (0x40, 0, 4, 8, 0x14, 0xAC, 0x84),
+            'max_ds': (0x40, 0, 4, 8, 0x14, 0xAC, 0x78)
         }
         self.last_valid_stats = None
+        # PID of the last process we attached to, tried before a full scan
+        self._cached_pid = None
+        self._read_process_memory = None  # bound on connect
+        # (hp, max_hp, ds, max_ds) behind last_valid_stats
+        self._last_valid_raw = None
+        # Poll quickly in combat or while stats are moving, slowly once they
+        # settle outside combat
+        self.active_read_interval = 0.05
+        self.idle_read_interval = 0.5
+        self._last_read_at = 0.0
+        self._stats_settled = False
 
     def connect(self):
         if not PYMEM_AVAILABLE:
@@ -33,24 +59,50 @@ class MemoryReader:
             self.connected = False
             self.base_address = None
             return False
-        for proc in psutil.process_iter(['name']):
-            if proc.info['name'] and proc.info['name'].lower() == self.process_name.lower():
-                try:
-                    self.pm = pymem.Pymem(self.process_name)
-                    self.base_address = self.pm.base_address + self.base_offset
-                    self.connected = True
-                    logger.info(f"Connected to {self.process_name} at base {hex(self.base_address)}")
-                    return True
-                except Exception as e:
-                    logger.error(f"Failed to connect to {self.process_name}: {e}")
-                    self.connected = False
-                    self.base_address = None
-                    return False
+        pid = self._find_process_id()
+        if pid is not None:
+            try:
+                # Attach by PID; opening by name would enumerate processes again
+                self.pm = pymem.Pymem()
+                self.pm.open_process_from_id(pid)
+                self.base_address = self.pm.base_address + self.base_offset
+                if self._read_process_memory is None:
+                    self._read_process_memory = _bind_read_process_memory()
+                self.connected = True
+                self._cached_pid = pid
+                # Read fresh from the new process on the next get_stats
+                self._next_read_at = 0.0
+                self._last_valid_raw = None
+                logger.info(f"Connected to {self.process_name} at base {hex(self.base_address)}")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to connect to {self.process_name}: {e}")
+                self._cached_pid = None
+                self.connected = False
+                self.base_address = None
+                return False
         logger.warning(f"Process {self.process_name} not found.")
         self.connected = False
         self.base_address = None
         return False
 
+    def _find_process_id(self):
+        """PID of the game process, checking the last known PID before scanning"""
+        target = self.process_name.lower()
+        pid = self._cached_pid
+        if pid is not None:
+            try:
+                if psutil.Process(pid).name().lower() == target:
+                    return pid
+            except psutil.Error:
+                pass
+            self._cached_pid = None
+        for proc in psutil.process_iter(['name']):
+            name = proc.info['name']
+            if name and name.lower() == target:
+                return proc.pid
+        return None
+
     def disconnect(self):
         if self.pm:
             try:
@@ -82,27 +134,110 @@ class MemoryReader:
 
     update_base_address = update_addresses  # Alias for GUI compatibility
 
-    def _read_pointer_chain(self, base, offsets):
-        try:
-            if not base or base == 0:
-                return 0
-            addr = base
-            for off in offsets[:-1]:
-                addr = self.pm.read_int(addr + off)
-                if not addr or addr == 0:
-                    return 0
-            return self.pm.read_int(addr + offsets[-1])
-        except Exception:
+    @property
+    def offsets(self):
+        """Pointer chain per stat; assign a new dict to change them"""
+        return self._offsets
+
+    @offsets.setter
+    def offsets(self, offsets):
+        self._offsets = {name: tuple(chain) for name, chain in offsets.items()}
+        self._read_plan = self._plan_reads(self._offsets)
+
+    @staticmethod
+    def _plan_reads(offsets):
+        """Group chains by shared pointer prefix, once per offsets change.
+        
+        Each entry is (prefix, first field offset, span in bytes, fields),
+        where fields pairs each stat name with its position in the span.
+        """
+        groups = {}
+        for name, chain in offsets.items():
+            groups.setdefault(chain[:-1], []).append((name, chain[-1]))
+        plan = []
+        for prefix, fields in groups.items():
+            low = min(off for _, off in fields)
+            high = max(off for _, off in fields) + 4
+            plan.append((prefix, low, high - low, tuple((name, off - low) for name, off in fields)))
+        return tuple(plan)
+
+    def _read_stat_values(self, base):
+        """Read every stat in self.offsets, sharing work between chains.
+        
+        Chains with the same pointer prefix are walked once, and the final
+        fields behind that pointer are fetched with a single read_bytes
+        spanning them all. Stats whose chain can't be read come back as 0.
+        """
+        values = {}
+        for prefix, low, span, fields in self._read_plan:
+            try:
+                addr = self._follow_pointers(base, prefix)
+                if not addr:
+                    raise ValueError("null pointer")
+                data = self.pm.read_bytes(addr + low, span)
+                for name, position in fields:
+                    values[name] = struct.unpack_from('<i', data, position)[0]
+            except Exception:
+                for name, _ in fields:
+                    values[name] = 0
+        return values
+
+    def _follow_pointers(self, base, offsets):
+        """Address reached by dereferencing base + each offset in turn; 0 on a null hop"""
+        if not base:
             return 0
+        # Call ReadProcessMemory directly into one buffer for the whole walk
+        # instead of letting read_int build a ctypes object per hop. The
+        # buffer is per call, not per reader: get_stats runs on the bot,
+        # healing and GUI threads, and a shared one could hand a walk the
+        # other chain's pointer. Hops are 32-bit addresses, so read them
+        # unsigned; c_int32 turns those at or above 0x80000000 negative.
+        read = self._read_process_memory
+        handle = self.pm.process_handle
+        value = ctypes.c_uint32()
+        buffer = ctypes.byref(value)
+        addr = base
+        for off in offsets:
+            if not read(handle, addr + off, buffer, 4, None):
+                raise OSError(ctypes.get_last_error(), f"ReadProcessMemory failed at {hex(addr + off)}")
+            addr = value.value
+            if not addr:
+                return 0
+        return addr
 
-    def get_stats(self):
+    def get_stats(self, in_combat=False):
+        """Current stats, served from the last read while it is fresh enough.
+        
+        The cache is good for active_read_interval in combat or while stats
+        are changing, and for idle_read_interval once they settle outside
+        combat. Each caller passes its own combat state, so a combat caller
+        never waits out an idle interval started by another.
+        """
         # Return default if not connected
         if not self.connected or not self.pm or not self.base_address:
             return {'hp': 1000, 'ds': 500, 'max_hp': 1000, 'max_ds': 500, 'hp_pct': 100.0, 'ds_pct': 100.0, 'connected': False}
-        hp, max_hp = self._read_pointer_chain(self.base_address, self.offsets['hp']), self._read_pointer_chain(self.base_address, self.offsets['max_hp'])
-        ds, max_ds = self._read_pointer_chain(self.base_address, self.offsets['ds']), self._read_pointer_chain(self.base_address, self.offsets['max_ds'])
+        now = monotonic()
+        if self._stats_settled and not in_combat:
+            interval = self.idle_read_interval
+        else:
+            interval = self.active_read_interval
+        if now - self._last_read_at < interval and self.last_valid_stats:
+            return self.last_valid_stats
+        self._last_read_at = now
+        # Until shown otherwise, assume things are changing
+        self._stats_settled = False
+        values = self._read_stat_values(self.base_address)
+        hp, max_hp = values['hp'], values['max_hp']
+        ds, max_ds = values['ds'], values['max_ds']
+        # Unchanged since the last valid read (the common idle case): the
+        # checks would pass again and build an identical dict
+        raw = (hp, max_hp, ds, max_ds)
+        if raw == self._last_valid_raw and self.last_valid_stats:
+            self._stats_settled = True
+            return self.last_valid_stats
         # Validity check: all values must be >0 and not ridiculously high
-        if all(0 < v <= 50000 for v in (hp, max_hp, ds, max_ds)) and hp <= max_hp * 1.1 and ds <= max_ds * 1.1:
+        if (0 < hp <= _STAT_MAX and 0 < max_hp <= _STAT_MAX and hp <= max_hp * _STAT_TOLERANCE and
+                0 < ds <= _STAT_MAX and 0 < max_ds <= _STAT_MAX and ds <= max_ds * _STAT_TOLERANCE):
             stats = {
                 'hp': hp,
                 'ds': ds,
@@ -113,6 +248,7 @@ class MemoryReader:
                 'connected': True
             }
             self.last_valid_stats = stats
+            self._last_valid_raw = raw
             return stats
         # Fallback
         return self.last_valid_stats if self.last_valid_stats else {
@@ -245,7 +245,12 @@ class MainWindow:
             self.combat_options[var_name] = tk.BooleanVar(value=True)
             tk.Checkbutton(options_frame, text=text, variable=self.combat_options[var_name], 
                           font=('Arial', 9), fg=self.colors['text'], 
-                          bg=self.colors['bg'], selectcolor=self.colors['primary']).pack(anchor='w', pady=1)
+                          bg=self.colors['bg'], selectcolor=self.colors['primary'],
+                          command=self.toggle_use_memory if var_name == "use_memory" else None).pack(anchor='w', pady=1)
+        
+        config_manager = getattr(self.app, 'config_manager', None)
+        if config_manager and hasattr(config_manager, 'memory'):
+            self.combat_options["use_memory"].set(config_manager.memory.use_memory)
         
     def create_healing_tab(self):
         """Create the healing configuration tab"""
@@ -473,6 +478,9 @@ class MainWindow:
                             item_config.threshold = item_vars['threshold'].get()
                             item_config.enabled = item_vars['enabled'].get()
                 
+                # Save memory toggle
+                self.apply_use_memory()
+                
                 # Save target name
                 # Store target name somewhere accessible
                 
@@ -483,6 +491,24 @@ class MainWindow:
         except Exception as e:
             self.log_message(f"❌ Failed to save settings: {e}")
             
+    def apply_use_memory(self):
+        """Push the memory checkbox into the config and the running bot engine"""
+        use_memory = self.combat_options["use_memory"].get()
+        if hasattr(self.app, 'config_manager') and self.app.config_manager:
+            self.app.config_manager.memory.use_memory = use_memory
+        # The engine snapshots this flag, so it has to be told about changes
+        if hasattr(self.app, 'bot_engine') and self.app.bot_engine is not None:
+            self.app.bot_engine.set_use_memory(use_memory)
+        
+    def toggle_use_memory(self):
+        """Apply the memory checkbox as soon as it is clicked"""
+        try:
+            self.apply_use_memory()
+            state = "enabled" if self.combat_options["use_memory"].get() else "disabled"
+            self.log_message(f"🧠 Memory reading {state}")
+        except Exception as e:
+            self.log_message(f"❌ Failed to toggle memory reading: {e}")
+            
     # Memory tab handlers
     def connect_memory(self):
         """Connect to memory"""
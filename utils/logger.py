@@ -9,6 +9,7 @@ from typing import Dict, List, Optional, Callable, Any
 from pathlib import Path
 from datetime import datetime
 import queue
+from collections import deque
 import json
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -21,7 +22,7 @@ class LogLevel(Enum):
     ERROR = "ERROR"
     CRITICAL = "CRITICAL"
 
-@dataclass
+@dataclass(slots=True)
 class LogEntry:
     """Log entry data structure"""
     timestamp: float
@@ -280,7 +281,8 @@ class MemoryHandler(LogHandler):
     def __init__(self, max_entries: int = 1000):
         super().__init__("memory")
         self.max_entries = max_entries
-        self.entries = []
+        # Bounded, so the oldest entry drops off in O(1) as a new one arrives
+        self.entries = deque(maxlen=max_entries)
         self.lock = threading.Lock()
         self.observers = []
     
@@ -288,10 +290,6 @@ class MemoryHandler(LogHandler):
         with self.lock:
             self.entries.append(entry)
             
-            # Maintain max entries
-            if len(self.entries) > self.max_entries:
-                self.entries.pop(0)
-            
             # Notify observers
             for observer in self.observers:
                 try:
@@ -311,7 +309,7 @@ class MemoryHandler(LogHandler):
     def get_entries(self, limit: Optional[int] = None, level_filter: Optional[str] = None) -> List[LogEntry]:
         """Get log entries with optional filtering"""
         with self.lock:
-            entries = self.entries.copy()
+            entries = list(self.entries)
         
         # Apply level filter
         if level_filter:
@@ -376,6 +374,16 @@ class AsyncLogHandler(LogHandler):
         if self.worker_thread:
             self.worker_thread.join(timeout=5)
 
+class _LogMetrics:
+    """Logger counters as slotted attributes (cheaper than dict item updates)"""
+    __slots__ = ('total_logs', 'logs_by_level', 'logs_by_category', 'start_time')
+    
+    def __init__(self):
+        self.total_logs = 0
+        self.logs_by_level = {level.value: 0 for level in LogLevel}
+        self.logs_by_category = {}
+        self.start_time = time.time()
+
 class Logger:
     """Main logger class with multiple handlers and advanced features"""
     
@@ -383,12 +391,9 @@ class Logger:
         self.name = name
         self.handlers = {}
         self.lock = threading.Lock()
-        self.stats = {
-            'total_logs': 0,
-            'logs_by_level': {level.value: 0 for level in LogLevel},
-            'logs_by_category': {},
-            'start_time': time.time()
-        }
+        self.metrics = _LogMetrics()
+        # Snapshot of handlers.values() for lock-free iteration in is_enabled_for
+        self._handler_list = ()
         
         # Setup default handlers
         self._setup_default_handlers()
@@ -414,6 +419,7 @@ class Logger:
         """Add a log handler"""
         with self.lock:
             self.handlers[handler.name] = handler
+            self._handler_list = tuple(self.handlers.values())
     
     def remove_handler(self, name: str):
         """Remove a log handler"""
@@ -422,6 +428,17 @@ class Logger:
                 handler = self.handlers.pop(name)
                 if isinstance(handler, AsyncLogHandler):
                     handler.stop()
+                self._handler_list = tuple(self.handlers.values())
+    
+    def is_enabled_for(self, level: str) -> bool:
+        """Check if a level would reach any handler, so callers can skip building the message"""
+        # Read the handlers' flags on every call rather than caching them:
+        # handler.enabled and the level filters are public and can be changed
+        # without going through the Logger
+        for handler in self._handler_list:
+            if handler.enabled and handler.filter.level_filters.get(level, True):
+                return True
+        return False
     
     def _log(self, level: str, message: str, category: str = "GENERAL", 
              source: str = "", emoji: str = ""):
@@ -441,10 +458,12 @@ class Logger:
         )
         
         # Update statistics
+        metrics = self.metrics
         with self.lock:
-            self.stats['total_logs'] += 1
-            self.stats['logs_by_level'][level] += 1
-            self.stats['logs_by_category'][category] = self.stats['logs_by_category'].get(category, 0) + 1
+            metrics.total_logs += 1
+            metrics.logs_by_level[level] += 1
+            by_category = metrics.logs_by_category
+            by_category[category] = by_category.get(category, 0) + 1
         
         # Send to handlers
         for handler in self.handlers.values():
@@ -528,14 +547,15 @@ class Logger:
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get logging statistics"""
+        metrics = self.metrics
         with self.lock:
-            uptime = time.time() - self.stats['start_time']
+            uptime = time.time() - metrics.start_time
             return {
-                'total_logs': self.stats['total_logs'],
-                'logs_by_level': self.stats['logs_by_level'].copy(),
-                'logs_by_category': self.stats['logs_by_category'].copy(),
+                'total_logs': metrics.total_logs,
+                'logs_by_level': metrics.logs_by_level.copy(),
+                'logs_by_category': metrics.logs_by_category.copy(),
                 'uptime': uptime,
-                'logs_per_minute': (self.stats['total_logs'] / max(1, uptime)) * 60,
+                'logs_per_minute': (metrics.total_logs / max(1, uptime)) * 60,
                 'active_handlers': len(self.handlers),
                 'handler_names': list(self.handlers.keys())
             }